@@ -1,16 +1,45 @@
 import streamlit as st
+import os
 import time
+import uuid
 from datetime import datetime
 from emotion_detector import EmotionDetector
+from engines import create_engine_from_env
+from load_shedding import OverloadController
 from response_generator import ResponseGenerator
+from response_pool import create_response_pool_from_env
+from slow_request_profiler import create_profiler_from_env
+from worker_pool import AnalysisWorkerPool, analyze_and_respond
 
 # Initialize the emotion detector and response generator
 @st.cache_resource
 def load_models():
     """Load and cache the emotion detection models"""
     emotion_detector = EmotionDetector()
-    response_generator = ResponseGenerator()
-    return emotion_detector, response_generator
+    emotion_detector.profiler = create_profiler_from_env()
+    emotion_detector.engine = create_engine_from_env(emotion_detector)
+    response_generator = create_response_pool_from_env(ResponseGenerator())
+    overload_controller = OverloadController(emotion_detector)
+    return emotion_detector, response_generator, overload_controller
+
+@st.cache_resource
+def load_worker_pool(num_workers):
+    """Start and cache the pool of analysis worker processes, or None if it cannot start"""
+    try:
+        # Do not wait for the workers to load their models: requests queue until
+        # they are ready, and the first page renders meanwhile
+        return AnalysisWorkerPool(num_workers=num_workers).start(wait=False)
+    except Exception as e:
+        # Cached as None, so reruns analyze in this process instead of respawning workers
+        print(f"Warning: could not start {num_workers} analysis workers, analyzing in-process: {e}")
+        return None
+
+def get_worker_pool():
+    """Return the worker pool when FEELBOT_WORKERS is set and it started, otherwise None"""
+    num_workers = int(os.environ.get('FEELBOT_WORKERS', '0'))
+    if num_workers <= 0:
+        return None
+    return load_worker_pool(num_workers)
 
 def initialize_session_state():
     """Initialize session state variables"""
@@ -26,8 +55,15 @@ def initialize_session_state():
         }
         st.session_state.messages.append(welcome_msg)
     
-    if 'emotion_detector' not in st.session_state:
-        st.session_state.emotion_detector, st.session_state.response_generator = load_models()
+    if 'session_id' not in st.session_state:
+        # Used to pin this conversation to one analysis worker
+        st.session_state.session_id = uuid.uuid4().hex
+    
+    # With a worker pool the models live in the workers and this process only renders
+    if 'emotion_detector' not in st.session_state and get_worker_pool() is None:
+        (st.session_state.emotion_detector,
+         st.session_state.response_generator,
+         st.session_state.overload_controller) = load_models()
 
 def get_emotion_emoji(emotion):
     """Get emoji representation for emotions"""
@@ -136,7 +172,17 @@ def main():
             
             # Analyze user's emotion and sentiment
             try:
-                emotion_data = st.session_state.emotion_detector.analyze_text(prompt)
+                worker_pool = get_worker_pool()
+                if worker_pool is not None:
+                    # Analysis runs in a worker process; this one only renders
+                    result = worker_pool.analyze(st.session_state.session_id, prompt)
+                    emotion_data, bot_response = result['analysis'], result['response']
+                else:
+                    emotion_data, bot_response = analyze_and_respond(
+                        st.session_state.overload_controller,
+                        st.session_state.response_generator,
+                        prompt
+                    )
                 
                 # Add user message to chat history
                 user_message = {
@@ -144,18 +190,11 @@ def main():
                     'content': prompt,
                     'emotion': emotion_data['primary_emotion'],
                     'sentiment': emotion_data['sentiment'],
+                    'mode': emotion_data.get('mode', 'full'),
                     'timestamp': current_time
                 }
                 st.session_state.messages.append(user_message)
                 
-                # Generate appropriate response based on emotion
-                bot_response = st.session_state.response_generator.generate_response(
-                    user_input=prompt,
-                    emotion=emotion_data['primary_emotion'],
-                    sentiment=emotion_data['sentiment'],
-                    emotion_scores=emotion_data['emotion_scores']
-                )
-                
                 # Add bot response to chat history
                 bot_message = {
                     'role': 'assistant',
@@ -252,6 +291,10 @@ def main():
             
             Built with TextBlob and NLTK for accurate emotion detection.
             """)
+    
+    # Load the NLP models in the background once the page has rendered
+    if os.environ.get('FEELBOT_WARMUP', '1') != '0' and get_worker_pool() is None:
+        st.session_state.emotion_detector.warm_up()
 
 if __name__ == "__main__":
     main()
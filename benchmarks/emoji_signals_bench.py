@@ -0,0 +1,88 @@
+"""Micro-benchmark for the emoji/emoticon signal extractor.
+
+Usage:
+    python benchmarks/emoji_signals_bench.py [--budget-us 5] [--number 20000]
+
+Checks extract_emoji_signals on a few known inputs, then times it on typical
+chat messages (already lowercased, as preprocessing passes them). Exits with
+status 1 if a check fails or the mean cost per message of any group goes over
+the budget.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emoji_signals import extract_emoji_signals
+
+MESSAGE_GROUPS = {
+    'plain ascii': [
+        "i'm so happy today, everything is going great!",
+        "this is absolutely infuriating, i hate waiting for hours!!!",
+        "i'm really worried about my exam tomorrow and can't sleep",
+        "just checking in to see how things work here",
+    ],
+    'emoticons': [
+        "finally done with work :)",
+        "i miss you so much :'(",
+        "that was hilarious xd",
+        ">:( why does this keep happening",
+    ],
+    'emojis': [
+        "i can't believe it 😭😭😭",
+        "best day ever 🎉🥳😂",
+        "seriously?? 😡🤬",
+        "café was closed again 🙄",
+    ],
+}
+
+# Emoticons glued to the end of a word: a mid-word 'd:' must not hide the ':(' after it
+EXPECTED_SIGNALS = {
+    "so sad:(": {'sadness': 1.0},
+    "mad:(": {'sadness': 1.0},
+    "good:)": {'joy': 1.0},
+    "i did:)": {'joy': 1.0},
+    "lol xd": {'joy': 1.5},
+    "oxd": {},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-us', type=float, default=5.0, help='max mean cost per message')
+    parser.add_argument('--number', type=int, default=20000, help='iterations per message')
+    args = parser.parse_args()
+    
+    failures = [
+        (text, dict(extract_emoji_signals(text)), expected)
+        for text, expected in EXPECTED_SIGNALS.items()
+        if dict(extract_emoji_signals(text)) != expected
+    ]
+    for text, got, expected in failures:
+        print(f"FAIL: {text!r} gave {got}, expected {expected}")
+    if failures:
+        return 1
+    
+    over_budget = False
+    print(f"{'group':<14}{'us/message':>12}")
+    for group, messages in MESSAGE_GROUPS.items():
+        total = 0.0
+        for message in messages:
+            total += min(timeit.repeat(
+                lambda: extract_emoji_signals(message), number=args.number, repeat=3
+            )) / args.number
+        mean_us = total / len(messages) * 1e6
+        over_budget = over_budget or mean_us > args.budget_us
+        print(f"{group:<14}{mean_us:>12.2f}")
+    
+    if over_budget:
+        print(f"\nFAIL: extractor cost is over the {args.budget_us:.1f} us budget")
+        return 1
+    print(f"\nOK: extractor cost is within the {args.budget_us:.1f} us budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Accuracy-vs-throughput comparison of the keyword and hashed n-gram engines.
+
+Usage:
+    python benchmarks/engine_comparison.py --data data/emotions.tsv [--model models/ngram]
+
+The data file has one `label<TAB>text` example per line. Without --model, the
+n-gram model is trained on a deterministic split (--holdout sets the held-out
+fraction) and both engines are evaluated on the held-out examples. Accuracy
+compares primary_emotion with the label; throughput runs analyze_batch in
+keyword mode so the shared TextBlob/VADER cost does not mask the engines.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_detector import EmotionDetector
+from engines import create_engine
+from ngram_engine import HashedNgramModel, read_labeled_file
+
+
+def evaluate(detector, examples, batch_size, mode):
+    """Return (accuracy, messages_per_second) for a detector"""
+    texts = [text for _, text in examples]
+    
+    # Warm up caches and lazy loading before timing
+    detector.analyze_batch(texts[:batch_size], mode=mode)
+    
+    start = time.perf_counter()
+    results = []
+    for i in range(0, len(texts), batch_size):
+        results.extend(detector.analyze_batch(texts[i:i + batch_size], mode=mode))
+    elapsed = time.perf_counter() - start
+    
+    correct = sum(1 for (label, _), result in zip(examples, results) if result['primary_emotion'] == label)
+    return correct / len(examples), len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', required=True, help='label<TAB>text file')
+    parser.add_argument('--model', help='trained n-gram model directory (default: train on a split)')
+    parser.add_argument('--holdout', type=float, default=0.2)
+    parser.add_argument('--batch-sizes', default='1,32,256')
+    parser.add_argument('--mode', default='keyword', choices=EmotionDetector.ANALYSIS_MODES)
+    args = parser.parse_args()
+    
+    examples = read_labeled_file(args.data)
+    if not examples:
+        print(f"No labeled examples found in {args.data}")
+        return 1
+    
+    model_dir = args.model
+    eval_examples = examples
+    if model_dir is None:
+        shuffled = examples[:]
+        random.Random(0).shuffle(shuffled)
+        split = int(len(shuffled) * (1 - args.holdout))
+        eval_examples = shuffled[split:]
+        model_dir = tempfile.mkdtemp(prefix='feelbot-ngram-')
+        start = time.perf_counter()
+        HashedNgramModel.train(shuffled[:split]).save(model_dir)
+        print(f"Trained n-gram model on {split} examples in {time.perf_counter() - start:.1f} s")
+    print(f"Evaluating on {len(eval_examples)} examples, mode={args.mode}\n")
+    
+    print(f"{'engine':<10}{'batch':>7}{'accuracy':>10}{'msg/s':>12}")
+    for engine_name in ('keyword', 'ngram'):
+        detector = EmotionDetector()
+        detector.engine = create_engine(engine_name, detector, model_dir)
+        for batch_size in [int(n) for n in args.batch_sizes.split(',')]:
+            accuracy, throughput = evaluate(detector, eval_examples, batch_size, args.mode)
+            print(f"{engine_name:<10}{batch_size:>7}{accuracy:>10.1%}{throughput:>12.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
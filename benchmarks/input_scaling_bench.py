@@ -0,0 +1,98 @@
+"""Fuzz/benchmark suite checking that analysis time grows linearly with input size.
+
+Usage:
+    python benchmarks/input_scaling_bench.py [--sizes 2000,8000,32000,128000] [--max-ratio 3]
+
+Runs EmotionDetector.analyze_text (keyword mode, so the regex paths dominate)
+on adversarial inputs such as long elongated runs, URL pastes, %-escape
+soups and all-caps walls, plus seeded random fuzz strings, at growing sizes
+with the input-length cap and chunking disabled. For each input family it
+reports the worst-case microseconds per character; if that cost at the
+largest size is more than --max-ratio times the cost at the smallest, growth
+is superlinear and the script exits with status 1. It also shows the latency of the default
+detector, where the input cap bounds the cost of a huge paste.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_detector import EmotionDetector
+
+FUZZ_ALPHABET = 'aeiou hapysdgr!?.,:;()-_%@#/\'"AZ019\n😭😡:)'
+
+
+def repeat_to(unit, size):
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def fuzz(size, seed):
+    rng = random.Random(seed)
+    return ''.join(rng.choice(FUZZ_ALPHABET) for _ in range(size))
+
+
+INPUT_FAMILIES = {
+    'elongated': lambda n: 'so ' + 'o' * n + ' happy',
+    'elongated_mix': lambda n: repeat_to('noooooooooooooo!!!!!!!!! ', n),
+    'urls': lambda n: repeat_to('http://example.com/a%20b?q=1&r=(2) ', n),
+    'percent_soup': lambda n: 'http://' + repeat_to('%4', n),
+    'all_caps': lambda n: repeat_to('ANGRY FURIOUS HATE ', n),
+    'caps_no_boundary': lambda n: 'A' * n + '1',
+    'keywords': lambda n: repeat_to('happy sad angry scared gross wow ', n),
+    'mentions_tags': lambda n: repeat_to('@someone #tag ', n),
+    'punctuation': lambda n: repeat_to('?!.,;:()-\'"<>[]{}', n),
+    'fuzz': lambda n: max((fuzz(n, seed) for seed in range(3)), key=len),
+}
+
+
+def time_call(detector, text, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        detector.analyze_text(text, mode='keyword')
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='2000,8000,32000,128000', help='comma-separated input sizes')
+    parser.add_argument('--max-ratio', type=float, default=3.0,
+                        help='max growth of per-character cost from smallest to largest size')
+    args = parser.parse_args()
+    sizes = [int(n) for n in args.sizes.split(',')]
+    
+    # No length cap and no chunking, so the regex paths themselves are measured
+    uncapped = EmotionDetector(max_input_length=float('inf'), chunk_size=float('inf'))
+    
+    print(f"{'family':<18}" + ''.join(f"{n:>12}" for n in sizes) + f"{'ratio':>8}   (us per char)")
+    superlinear = []
+    for family, make_input in INPUT_FAMILIES.items():
+        per_char = []
+        for size in sizes:
+            text = make_input(size)
+            per_char.append(time_call(uncapped, text) * 1e6 / len(text))
+        ratio = per_char[-1] / per_char[0]
+        if ratio > args.max_ratio:
+            superlinear.append(family)
+        print(f"{family:<18}" + ''.join(f"{c:>12.3f}" for c in per_char) + f"{ratio:>8.2f}")
+    
+    # With the default cap, latency stops growing past max_input_length
+    capped = EmotionDetector()
+    print(f"\nDefault detector (max_input_length={capped.max_input_length}, chunk_size={capped.chunk_size}):")
+    for size in sizes:
+        text = INPUT_FAMILIES['fuzz'](size)
+        print(f"  {size:>8} chars: {time_call(capped, text) * 1000:8.2f} ms")
+    
+    if superlinear:
+        print(f"\nFAIL: superlinear growth for {', '.join(superlinear)}")
+        return 1
+    print("\nOK: worst-case cost grows linearly with input size")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
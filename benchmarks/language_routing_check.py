@@ -0,0 +1,71 @@
+"""Regression check for language routing.
+
+Usage:
+    python benchmarks/language_routing_check.py [--budget-us 80]
+
+Short English messages made of emotion words once routed to a foreign lexicon
+shard and came back neutral. This runs known English and non-English messages
+through EmotionDetector in keyword mode, checks the detected language and
+primary emotion, and times LanguageIdentifier.detect. Exits with status 1 if
+a message is misrouted or misclassified, or detection goes over the budget.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_detector import EmotionDetector
+
+# (text, expected language, expected primary emotion in keyword mode)
+CASES = [
+    ("terrible terrible terrible", 'en', 'disgust'),
+    ("panic panic panic panic", 'en', 'fear'),
+    ("Incredible, unbelievable performance", 'en', 'surprise'),
+    ("miserable miserable", 'en', 'sadness'),
+    ("I am desperate", 'en', 'neutral'),
+    ("fantastic party", 'en', 'joy'),
+    ("I am so happy today", 'en', 'joy'),
+    ("Estoy muy triste hoy", 'es', 'sadness'),
+    ("tengo miedo", 'es', 'fear'),
+    ("Je suis très heureux aujourd'hui", 'fr', 'joy'),
+    ("Ich habe solche Angst vor morgen", 'de', 'fear'),
+    ("Estou muito feliz hoje", 'pt', 'joy'),
+    ("Sono molto arrabbiato con te", 'it', 'anger'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-us', type=float, default=80.0, help='max mean cost of detect()')
+    args = parser.parse_args()
+
+    detector = EmotionDetector()
+    failures = 0
+    for text, language, emotion in CASES:
+        result = detector.analyze_text(text, mode='keyword')
+        ok = result['language'] == language and result['primary_emotion'] == emotion
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<6}{result['language']:<4}{result['primary_emotion']:<10}{text}")
+
+    number = 2000
+    texts = [text for text, _, _ in CASES]
+    elapsed = min(timeit.repeat(
+        lambda: [detector.language_identifier.detect(text) for text in texts], number=number, repeat=3
+    ))
+    detect_us = elapsed / (number * len(texts)) * 1e6
+    print(f"\ndetect(): {detect_us:.1f} us/message")
+
+    if failures:
+        print(f"\nFAIL: {failures} of {len(CASES)} messages misrouted or misclassified")
+        return 1
+    if detect_us > args.budget_us:
+        print(f"\nFAIL: language detection is over the {args.budget_us:.0f} us budget")
+        return 1
+    print("\nOK: all messages routed and classified as expected")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
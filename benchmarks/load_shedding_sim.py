@@ -0,0 +1,217 @@
+"""Simulated load test for the overload controller in load_shedding.py.
+
+Usage:
+    python benchmarks/load_shedding_sim.py [--load 1.5] [--requests 20000]
+    python benchmarks/load_shedding_sim.py --cost-ms full=20,keyword=0.5,sentiment=0.3
+
+Per-mode service costs are calibrated by timing the real EmotionDetector and
+ResponseGenerator (or taken from --cost-ms). Requests then arrive as a Poisson
+process at `--load` times the full-mode capacity and are served FIFO by a
+single worker, once with every request in full mode and once with the
+OverloadController choosing the mode. A few scripted scenarios then check that
+a single outlier does not demote the service and that recovery also happens
+after calm or idle time. Exits with status 1 if the controlled p99 latency
+goes over the latency budget or a scenario fails.
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_detector import EmotionDetector
+from load_shedding import OverloadController
+from response_generator import ResponseGenerator
+
+SAMPLE_MESSAGES = [
+    "I'm so happy today, everything is going great!",
+    "This is absolutely infuriating, I hate waiting for hours!!!",
+    "I'm really worried about my exam tomorrow and can't sleep",
+    "I feel so lonely and sad since my friend moved away",
+    "Wow, I did not expect that at all, what a surprise?",
+    "That food was disgusting, gross and nasty",
+    "Just checking in to see how things work here",
+    "Sooooo excited for the party tonight!!! It's going to be AMAZING",
+]
+
+
+def calibrate_costs(repeats=50):
+    """Measure the mean cost in ms of analysis plus response for each mode"""
+    detector = EmotionDetector()
+    generator = ResponseGenerator()
+    detector.warm_up(background=False)
+    
+    costs = {}
+    for mode in detector.ANALYSIS_MODES:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for message in SAMPLE_MESSAGES:
+                result = detector.analyze_text(message, mode=mode)
+                if mode == 'sentiment':
+                    generator.get_fallback_response(result['primary_emotion'], result['sentiment'])
+                else:
+                    generator.generate_response(
+                        message, result['primary_emotion'], result['sentiment'], result['emotion_scores']
+                    )
+        costs[mode] = (time.perf_counter() - start) * 1000 / (repeats * len(SAMPLE_MESSAGES))
+    return costs
+
+
+def parse_costs(spec):
+    """Parse 'full=20,keyword=0.5,sentiment=0.3' into a dict"""
+    costs = {}
+    for item in spec.split(','):
+        mode, value = item.split('=')
+        costs[mode.strip()] = float(value)
+    return costs
+
+
+class SimulatedClock:
+    """Controller clock that follows simulated time instead of wall time"""
+    def __init__(self):
+        self.now_ms = 0.0
+    
+    def __call__(self):
+        return self.now_ms / 1000
+
+
+def simulate(costs, arrival_rate, num_requests, controller=None, clock=None, seed=0):
+    """Run a single-worker FIFO queue and return latencies and the mode mix"""
+    rng = random.Random(seed)
+    pending = []  # heap of (finish_ms, arrival_ms)
+    latencies = []
+    mode_counts = {}
+    now = 0.0
+    server_free = 0.0
+    
+    for _ in range(num_requests):
+        now += rng.expovariate(arrival_rate)
+        if clock is not None:
+            clock.now_ms = now
+        
+        # Report requests that finished before this arrival
+        while pending and pending[0][0] <= now:
+            finish, arrival = heapq.heappop(pending)
+            if controller is not None:
+                controller.record_latency(finish - arrival)
+        
+        queue_depth = len(pending) + 1
+        mode = controller.select_mode(queue_depth) if controller is not None else 'full'
+        mode_counts[mode] = mode_counts.get(mode, 0) + 1
+        
+        service = costs[mode] * rng.expovariate(1.0)
+        finish = max(now, server_free) + service
+        server_free = finish
+        heapq.heappush(pending, (finish, now))
+        latencies.append(finish - now)
+    
+    return latencies, mode_counts
+
+
+def run_scenarios(budget, max_queue_depth):
+    """Return (name, passed, detail) for scripted controller scenarios"""
+    results = []
+    
+    def make_controller():
+        clock = SimulatedClock()
+        controller = OverloadController(
+            EmotionDetector(), max_queue_depth=max_queue_depth, latency_budget_ms=budget, clock=clock
+        )
+        return controller, clock
+    
+    # One huge latency (e.g. a cold first request) followed by light traffic
+    controller, clock = make_controller()
+    controller.record_latency(budget * 100)
+    modes = []
+    for _ in range(300):
+        clock.now_ms += 100
+        modes.append(controller.select_mode(1))
+        controller.record_latency(budget / 50)
+    demoted = sum(mode != 'full' for mode in modes)
+    results.append(('single outlier', demoted == 0, f"{demoted} of {len(modes)} requests degraded"))
+    
+    # Overload down to sentiment mode, then an idle gap of two recovery periods
+    controller, clock = make_controller()
+    for _ in range(max_queue_depth * 4):
+        clock.now_ms += 1
+        controller.select_mode(max_queue_depth + 1)
+    degraded = controller.current_mode
+    clock.now_ms += controller.recovery_seconds * 2000 + 1
+    mode = controller.select_mode(1)
+    results.append(('idle recovery', degraded == 'sentiment' and mode == 'full',
+                    f"{degraded} -> {mode} after {controller.recovery_seconds * 2:.0f} s idle"))
+    
+    # Overload, then sparse calm traffic: recovery by time, not request count
+    controller, clock = make_controller()
+    for _ in range(max_queue_depth * 2):
+        clock.now_ms += 1
+        controller.select_mode(max_queue_depth + 1)
+    requests = 0
+    while controller.current_mode != 'full' and requests < controller.recovery_samples:
+        clock.now_ms += 2000
+        controller.select_mode(1)
+        controller.record_latency(budget / 50)
+        requests += 1
+    results.append(('calm recovery', controller.current_mode == 'full',
+                    f"back to full after {requests} requests, 2 s apart"))
+    
+    return results
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--load', type=float, default=1.5, help='offered load as a multiple of full-mode capacity')
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--cost-ms', help="per-mode costs, e.g. 'full=20,keyword=0.5,sentiment=0.3'")
+    parser.add_argument('--latency-budget-ms', type=float, help='controller p99 budget (default: 10x full cost)')
+    parser.add_argument('--max-queue-depth', type=int, default=8)
+    args = parser.parse_args()
+    
+    costs = parse_costs(args.cost_ms) if args.cost_ms else calibrate_costs()
+    budget = args.latency_budget_ms or costs['full'] * 10
+    arrival_rate = args.load / costs['full']  # requests per ms
+    
+    print("Per-request cost (ms): " + ', '.join(f"{mode}={cost:.3f}" for mode, cost in costs.items()))
+    print(f"Offered load: {args.load:.2f}x full-mode capacity, latency budget {budget:.2f} ms\n")
+    
+    clock = SimulatedClock()
+    controller = OverloadController(
+        EmotionDetector(), max_queue_depth=args.max_queue_depth, latency_budget_ms=budget, clock=clock
+    )
+    runs = [
+        ('always full', simulate(costs, arrival_rate, args.requests)),
+        ('load shedding', simulate(costs, arrival_rate, args.requests, controller, clock)),
+    ]
+    
+    print(f"{'policy':<15}{'p50 ms':>12}{'p99 ms':>12}{'max ms':>12}  modes")
+    for name, (latencies, mode_counts) in runs:
+        mix = ', '.join(f"{mode}={count / len(latencies):.0%}" for mode, count in sorted(mode_counts.items()))
+        print(f"{name:<15}{percentile(latencies, 50):>12.2f}{percentile(latencies, 99):>12.2f}"
+              f"{max(latencies):>12.2f}  {mix}")
+    
+    scenarios = run_scenarios(budget, args.max_queue_depth)
+    print()
+    for name, passed, detail in scenarios:
+        print(f"{'ok' if passed else 'FAIL':<6}{name:<16}{detail}")
+    
+    shed_p99 = percentile(runs[1][1][0], 99)
+    if not all(passed for _, passed, _ in scenarios):
+        print("\nFAIL: a controller scenario failed")
+        return 1
+    if shed_p99 > budget:
+        print(f"\nFAIL: load-shedding p99 {shed_p99:.2f} ms is over the {budget:.2f} ms budget")
+        return 1
+    print(f"\nOK: load-shedding p99 {shed_p99:.2f} ms is within the {budget:.2f} ms budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
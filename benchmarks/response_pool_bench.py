@@ -0,0 +1,145 @@
+"""Latency and repetition check for the precomputed response pool.
+
+Usage:
+    python benchmarks/response_pool_bench.py [--requests 50000] [--burst 8]
+
+Serves the same stream of (message, emotion, scores) requests by assembling
+each reply with ResponseGenerator.generate_response and from a ResponsePool.
+Requests arrive in bursts with a short pause between them so the refill
+thread can run, and only the serving calls are timed; the key lookup (topic
+and intensity) is timed on its own to show what a pooled reply costs beyond
+the deque pop. Exits with status 1 if
+serving from the pool is not faster than assembling, if the two sources
+disagree on a reply's topic sentence, or if a reply comes back for the same
+key within the pool's repeat window.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_generator import ResponseGenerator
+from response_pool import ResponsePool
+
+MESSAGES = [
+    "my boss yelled at me again today",
+    "i can't stop thinking about my exam tomorrow",
+    "my sister is finally coming home!",
+    "i feel so alone lately",
+    "what a day, nothing special happened",
+    "the hospital called with my results",
+    "my girlfriend surprised me with tickets",
+    "that restaurant was disgusting",
+]
+
+
+def make_requests(generator, count, seed=0):
+    rng = random.Random(seed)
+    emotions = list(generator.emotion_responses)
+    requests = []
+    for _ in range(count):
+        emotion = rng.choice(emotions)
+        scores = {} if emotion == 'neutral' else {emotion: rng.random()}
+        requests.append((rng.choice(MESSAGES), emotion, scores))
+    return requests
+
+
+def time_source(respond, requests, burst):
+    """Return (mean_us, replies) for serving every request with respond()"""
+    replies = []
+    elapsed = 0.0
+    for i in range(0, len(requests), burst):
+        start = time.perf_counter()
+        for text, emotion, scores in requests[i:i + burst]:
+            replies.append(respond(text, emotion, scores))
+        elapsed += time.perf_counter() - start
+        time.sleep(0.0005)
+    return elapsed / len(requests) * 1e6, replies
+
+
+def topic_mismatches(generator, direct_replies, pooled_replies):
+    """Count requests where only one source added a topic sentence, or different ones"""
+    sentences = [sentence for _, sentence in generator.topics.values()]
+    
+    def topic_sentence(reply):
+        return next((sentence for sentence in sentences if reply.endswith(sentence)), None)
+    
+    return sum(topic_sentence(direct) != topic_sentence(pooled)
+               for direct, pooled in zip(direct_replies, pooled_replies))
+
+
+def shortest_repeat_gap(generator, requests, replies):
+    """Smallest number of requests between identical replies for the same key"""
+    last_seen = {}
+    shortest = None
+    counts = {}
+    for (text, emotion, scores), reply in zip(requests, replies):
+        key = (emotion, generator.is_high_intensity(scores), generator.detect_topic(text))
+        index = counts.get(key, 0)
+        counts[key] = index + 1
+        previous = last_seen.get((key, reply))
+        if previous is not None:
+            gap = index - previous
+            shortest = gap if shortest is None else min(shortest, gap)
+        last_seen[(key, reply)] = index
+    return shortest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=50000)
+    parser.add_argument('--burst', type=int, default=8, help='requests served between pauses')
+    args = parser.parse_args()
+    
+    generator = ResponseGenerator()
+    requests = make_requests(generator, args.requests)
+    
+    start = time.perf_counter()
+    pool = ResponsePool(generator).start()
+    print(f"Precomputed {pool.stats()['pooled']} replies for {pool.stats()['keys']} keys "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+    
+    direct_us, direct_replies = time_source(
+        lambda text, emotion, scores: generator.generate_response(text, emotion, 'neutral', scores),
+        requests, args.burst
+    )
+    pooled_us, replies = time_source(
+        lambda text, emotion, scores: pool.generate_response(text, emotion, 'neutral', scores),
+        requests, args.burst
+    )
+    # The input-dependent part of a pooled reply: working out its key
+    key_us, _ = time_source(
+        lambda text, emotion, scores: (generator.is_high_intensity(scores), generator.detect_topic(text)),
+        requests, args.burst
+    )
+    pool.close()
+    
+    stats = pool.stats()
+    print(f"{'source':<12}{'us/reply':>10}")
+    print(f"{'assembled':<12}{direct_us:>10.2f}")
+    print(f"{'pool':<12}{pooled_us:>10.2f}")
+    print(f"{'  key only':<12}{key_us:>10.2f}")
+    print(f"\nPool hits: {stats['hits']}, misses: {stats['misses']}")
+    mismatches = topic_mismatches(generator, direct_replies, replies)
+    print(f"Topic sentence mismatches between sources: {mismatches}")
+    gap = shortest_repeat_gap(generator, requests, replies)
+    print(f"Shortest repeat gap within a key: {gap} (window {pool.repeat_window})")
+    
+    if pooled_us >= direct_us:
+        print("\nFAIL: serving from the pool is not faster than assembling replies")
+        return 1
+    if mismatches:
+        print("\nFAIL: the pool and the generator disagree on topic context")
+        return 1
+    if gap is not None and gap <= pool.repeat_window:
+        print("\nFAIL: a reply repeated within the repeat window")
+        return 1
+    print("\nOK: pooled replies are faster and do not repeat within the window")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Startup report for FeelBot: import times, time-to-first-render and idle RSS.
+
+Usage:
+    python benchmarks/startup_report.py [--top 15] [--budget benchmarks/startup_budget.json]
+
+The import section runs ``python -X importtime`` in a fresh interpreter. The
+render section runs app.py once through Streamlit's AppTest harness with the
+background NLP warm-up disabled, so the numbers reflect what a new replica
+pays before it can serve its first page. Exits with status 1 when a value
+exceeds the tracked budget.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = os.path.join(REPO_ROOT, 'benchmarks', 'startup_budget.json')
+
+# Modules that must only be imported on first analysis
+HEAVY_MODULES = ['nltk', 'textblob']
+
+RENDER_PROBE = '''
+import json, os, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(os.path.join({root!r}, 'app.py'), default_timeout=120)
+at.run()
+elapsed_ms = (time.perf_counter() - start) * 1000
+rss_kb = None
+try:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                rss_kb = int(line.split()[1])
+except OSError:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    'time_to_first_render_ms': elapsed_ms,
+    'idle_rss_mb': rss_kb / 1024 if rss_kb else None,
+    'exceptions': [str(e.value) for e in at.exception],
+    'heavy_modules_loaded': sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+'''
+
+
+def run_importtime(module):
+    """Run `python -X importtime -c 'import <module>'` and parse the output"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            entries.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    
+    return result.returncode, entries
+
+
+def print_import_report(module, entries, top):
+    """Print the slowest imports by cumulative time"""
+    total_us = next((cum for name, _, cum in entries if name == module), 0)
+    print(f"\n== import {module}: {total_us / 1000:.1f} ms cumulative ==")
+    for name, self_us, cumulative_us in sorted(entries, key=lambda e: e[2], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {self_us / 1000:8.1f} ms self  {name}")
+    return total_us / 1000
+
+
+def run_render_probe():
+    """Render app.py once in a fresh process and return its measurements"""
+    env = dict(os.environ, FEELBOT_WARMUP='0')
+    probe = RENDER_PROBE.format(root=REPO_ROOT, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, '-c', probe], cwd=REPO_ROOT, env=env,
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr.strip())
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=15, help='number of imports to list')
+    parser.add_argument('--budget', default=DEFAULT_BUDGET, help='budget JSON file')
+    parser.add_argument('--skip-render', action='store_true', help='only report import times')
+    args = parser.parse_args()
+    
+    with open(args.budget) as f:
+        budget = json.load(f)
+    
+    measured = {}
+    
+    returncode, entries = run_importtime('emotion_detector')
+    if returncode != 0:
+        print("Error: importing emotion_detector failed")
+        return 1
+    measured['emotion_detector_import_ms'] = print_import_report('emotion_detector', entries, args.top)
+    imported = {name.split('.')[0] for name, _, _ in entries}
+    measured['heavy_modules_at_import'] = sorted(m for m in HEAVY_MODULES if m in imported)
+    
+    returncode, entries = run_importtime('app')
+    if returncode == 0:
+        print_import_report('app', entries, args.top)
+    else:
+        print("\nSkipping `import app` report (streamlit is not importable)")
+    
+    if not args.skip_render:
+        probe = run_render_probe()
+        if probe is None:
+            print("\nError: the first-render probe failed")
+            return 1
+        if probe['exceptions']:
+            print(f"\nWarning: app raised during render: {probe['exceptions']}")
+        measured['time_to_first_render_ms'] = probe['time_to_first_render_ms']
+        measured['idle_rss_mb'] = probe['idle_rss_mb']
+        print(f"\nHeavy modules loaded after first render: {probe['heavy_modules_loaded'] or 'none'}")
+    
+    # Compare against the tracked budget
+    print("\n== budget ==")
+    over_budget = False
+    for key, limit in budget.items():
+        if key not in measured or measured[key] is None:
+            continue
+        value = measured[key]
+        if isinstance(limit, list):
+            ok = set(value) <= set(limit)
+            print(f"  {'OK  ' if ok else 'OVER'} {key}: {value} (allowed: {limit})")
+        else:
+            ok = value <= limit
+            print(f"  {'OK  ' if ok else 'OVER'} {key}: {value:.1f} (budget: {limit})")
+        over_budget = over_budget or not ok
+    
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Throughput and tail-latency harness for the analysis worker pool.
+
+Usage:
+    python benchmarks/worker_pool_bench.py [--workers 1,2,4] [--requests 2000] [--clients 32]
+
+For each worker count it starts an AnalysisWorkerPool, waits until every
+worker has loaded its models, then sends `--requests` messages from
+`--clients` concurrent client threads (one session per client) and reports
+aggregate throughput and p50/p99 latency.
+
+It then checks recovery: with requests in flight on two workers, worker 1 is
+SIGKILLed as soon as it has sent a result. Every in-flight request must
+finish or fail (none may hang), and afterwards both workers must answer
+again, worker 1 from a new process.
+Exits with status 1 if the pool does not recover.
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from worker_pool import AnalysisWorkerPool
+
+SAMPLE_MESSAGES = [
+    "I'm so happy today, everything is going great!",
+    "This is absolutely infuriating, I hate waiting for hours!!!",
+    "I'm really worried about my exam tomorrow and can't sleep",
+    "I feel so lonely and sad since my friend moved away",
+    "Wow, I did not expect that at all, what a surprise?",
+    "That food was disgusting, gross and nasty",
+    "Just checking in to see how things work here",
+    "Sooooo excited for the party tonight!!! It's going to be AMAZING",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_clients(pool, num_requests, num_clients):
+    """Send requests from concurrent clients and return (elapsed_s, latencies_ms)"""
+    latencies = []
+    lock = threading.Lock()
+    per_client = max(1, num_requests // num_clients)
+    
+    def client(client_index):
+        session_id = f'bench-session-{client_index}'
+        local = []
+        for i in range(per_client):
+            text = SAMPLE_MESSAGES[(client_index + i) % len(SAMPLE_MESSAGES)]
+            start = time.perf_counter()
+            pool.analyze(session_id, text)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+    
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(num_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def kill_and_recover(in_flight=200, timeout=60):
+    """SIGKILL a busy worker and return a list of problems (empty if the pool recovered)"""
+    pool = AnalysisWorkerPool(num_workers=2).start()
+    try:
+        # One session per worker
+        sessions = {}
+        client = 0
+        while len(sessions) < 2:
+            sessions.setdefault(pool.worker_for(f'recover-{client}'), f'recover-{client}')
+            client += 1
+        old_pids = pool.worker_pids()
+        
+        futures = [pool.submit(sessions[i % 2], SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)])
+                   for i in range(in_flight)]
+        # Kill worker 1 once it is busy sending results back
+        futures[1].result(timeout=timeout)
+        os.kill(old_pids[1], signal.SIGKILL)
+        
+        problems = []
+        failed = 0
+        for future in futures:
+            try:
+                future.result(timeout=timeout)
+            except RuntimeError:
+                failed += 1
+            except TimeoutError:
+                problems.append("an in-flight request hung after the kill")
+                break
+        
+        for index, session_id in sorted(sessions.items()):
+            try:
+                result = pool.analyze(session_id, SAMPLE_MESSAGES[0], timeout=timeout)
+            except (RuntimeError, TimeoutError) as e:
+                problems.append(f"worker {index} did not answer after the kill: {e!r}")
+                continue
+            if result['worker'] != index:
+                problems.append(f"session for worker {index} was answered by worker {result['worker']}")
+        
+        new_pids = pool.worker_pids()
+        if new_pids[1] == old_pids[1]:
+            problems.append("worker 1 was not restarted")
+        if new_pids[0] != old_pids[0]:
+            problems.append("worker 0 was restarted although it was not killed")
+        print(f"\nKilled worker 1 with {in_flight} requests in flight: {failed} failed, "
+              f"{in_flight - failed} answered, both workers answering afterwards: {not problems}")
+        return problems
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4', help='comma-separated worker counts')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=32)
+    args = parser.parse_args()
+    
+    print(f"{'workers':>8}{'req/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for num_workers in [int(n) for n in args.workers.split(',')]:
+        pool = AnalysisWorkerPool(num_workers=num_workers).start()
+        try:
+            # Warm each worker's caches before measuring
+            run_clients(pool, num_workers * 20, num_workers)
+            elapsed, latencies = run_clients(pool, args.requests, args.clients)
+        finally:
+            pool.close()
+        
+        print(f"{num_workers:>8}{len(latencies) / elapsed:>12.1f}{percentile(latencies, 50):>10.2f}"
+              f"{percentile(latencies, 99):>10.2f}{max(latencies):>10.2f}")
+    
+    problems = kill_and_recover()
+    if problems:
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        return 1
+    print("OK: the pool recovered from a killed worker")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
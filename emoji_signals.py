@@ -0,0 +1,94 @@
+import re
+from collections import defaultdict
+
+# Emoji codepoint -> (emotion, weight). Very strong signals get a higher weight.
+EMOJI_EMOTIONS = {}
+
+_EMOJI_GROUPS = {
+    'joy': (1.0, '😀😁😃😄😅😆😊😇🙂🙃😉😋😎🤩🥳😺😸😻☺❤♥💕💖💗💓💞💘💝🎉🎊👍🙌👏✨🤗😌'),
+    'anger': (1.0, '😠😤👿💢🖕👊'),
+    'fear': (1.0, '😨😰😧😦😬😟🙀😖'),
+    'sadness': (1.0, '😢😞😔😥😓😩😫☹🙁😿🥺😪😣'),
+    'surprise': (1.0, '😮😯😲😳😵‼⁉❗'),
+    'disgust': (1.0, '🤢😒🙄💩🤧'),
+}
+_STRONG_EMOJIS = {
+    'joy': '😂🤣😍🥰😘',
+    'anger': '😡🤬',
+    'fear': '😱',
+    'sadness': '😭💔',
+    'surprise': '🤯',
+    'disgust': '🤮',
+}
+
+for _emotion, (_weight, _chars) in _EMOJI_GROUPS.items():
+    for _char in _chars:
+        EMOJI_EMOTIONS[_char] = (_emotion, _weight)
+for _emotion, _chars in _STRONG_EMOJIS.items():
+    for _char in _chars:
+        EMOJI_EMOTIONS[_char] = (_emotion, 1.5)
+
+# Emoticons as they look after lowercasing -> (emotion, weight)
+EMOTICON_EMOTIONS = {
+    ':)': ('joy', 1.0), ':-)': ('joy', 1.0), '=)': ('joy', 1.0), ':]': ('joy', 1.0),
+    ':d': ('joy', 1.5), ':-d': ('joy', 1.5), 'xd': ('joy', 1.5), ';)': ('joy', 0.5),
+    ';-)': ('joy', 0.5), ':p': ('joy', 0.5), ':-p': ('joy', 0.5), '<3': ('joy', 1.0),
+    '^_^': ('joy', 1.0), '^^': ('joy', 0.5),
+    ':(': ('sadness', 1.0), ':-(': ('sadness', 1.0), '=(': ('sadness', 1.0),
+    ':[': ('sadness', 1.0), ":'(": ('sadness', 1.5), ":'-(": ('sadness', 1.5),
+    ';_;': ('sadness', 1.5), 't_t': ('sadness', 1.5), '</3': ('sadness', 1.5),
+    '>:(': ('anger', 1.5), '>:-(': ('anger', 1.5), '>:[': ('anger', 1.5),
+    'd:': ('fear', 1.0), 'd-:': ('fear', 1.0),
+    ':o': ('surprise', 1.0), ':-o': ('surprise', 1.0), 'o_o': ('surprise', 1.0),
+    'o.o': ('surprise', 1.0), '0_0': ('surprise', 1.0),
+    ':/': ('disgust', 0.5), ':-/': ('disgust', 0.5), ':s': ('disgust', 0.5),
+}
+
+def _emoticon_alternative(emoticon):
+    """Escape an emoticon, adding a word boundary where it ends with a letter"""
+    pattern = re.escape(emoticon)
+    if emoticon[-1].isalnum():
+        pattern += r'(?!\w)'
+    return pattern
+
+# Candidate emoji characters are found with a single cheap range; the table
+# lookup then decides. (A character class listing every emoji is several
+# times slower because astral codepoints defeat the regex charset bitmap.)
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+
+# Longest emoticons first so '>:(' wins over ':('. Every alternative starts
+# with a literal so the regex engine can skip ahead on its first-character
+# set; the leading word boundary is checked in extract_emoji_signals, which
+# rescans one character later when a match starts mid-word.
+EMOTICON_PATTERN = re.compile('|'.join(
+    _emoticon_alternative(e) for e in sorted(EMOTICON_EMOTIONS, key=len, reverse=True)
+))
+
+def extract_emoji_signals(text):
+    """Return weighted emotion counts for the emojis and emoticons in lowercased text"""
+    signals = defaultdict(float)
+    
+    # Plain ASCII text cannot contain emojis (isascii is O(1) on str)
+    if not text.isascii():
+        for char in NON_ASCII_PATTERN.findall(text):
+            signal = EMOJI_EMOTIONS.get(char)
+            if signal is not None:
+                signals[signal[0]] += signal[1]
+    
+    position = 0
+    while True:
+        match = EMOTICON_PATTERN.search(text, position)
+        if match is None:
+            break
+        emoticon = match.group()
+        start = match.start()
+        if emoticon[0].isalnum() and start and (text[start - 1].isalnum() or text[start - 1] == '_'):
+            # Mid-word, e.g. the 'd:' in 'sad:(' - rescan from the next
+            # character so the emoticon that follows is still found
+            position = start + 1
+            continue
+        emotion, weight = EMOTICON_EMOTIONS[emoticon]
+        signals[emotion] += weight
+        position = match.end()
+    
+    return signals
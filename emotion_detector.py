@@ -1,29 +1,55 @@
-import nltk
 import re
-from textblob import TextBlob
+import threading
 from collections import defaultdict
 import os
 
+from emoji_signals import extract_emoji_signals
+from engines import KeywordEngine
+from language_id import LanguageIdentifier
+from lexicon_shards import LexiconShardCache
+
 class EmotionDetector:
-    def __init__(self):
-        """Initialize the emotion detector with necessary NLTK data"""
-        try:
-            # Download required NLTK data
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            nltk.download('vader_lexicon', quiet=True)
-            nltk.download('wordnet', quiet=True)
-            
-            from nltk.corpus import stopwords
-            from nltk.sentiment import SentimentIntensityAnalyzer
-            
-            self.stop_words = set(stopwords.words('english'))
-            self.sia = SentimentIntensityAnalyzer()
-            
-        except Exception as e:
-            print(f"Warning: NLTK setup failed: {e}")
-            self.stop_words = set()
-            self.sia = None
+    # Analysis modes, from most to least expensive
+    ANALYSIS_MODES = ('full', 'keyword', 'sentiment')
+    
+    def __init__(self, max_input_length=20000, chunk_size=2000, languages=None, max_lexicon_shards=4):
+        """Initialize the emotion detector (NLTK and TextBlob are loaded lazily)
+        
+        Input beyond `max_input_length` characters is ignored, and messages
+        longer than `chunk_size` are analyzed in chunks whose results are
+        merged, so one huge paste cannot tie up a worker.
+        
+        Each message is routed by language: English uses the built-in
+        pipeline, other `languages` use lexicon shards that are loaded on
+        first use, with at most `max_lexicon_shards` kept in memory.
+        """
+        if max_input_length <= 0:
+            raise ValueError("max_input_length must be positive")
+        # Chunks split between chunk_size // 2 and chunk_size, which must be past the start
+        if chunk_size < 2:
+            raise ValueError("chunk_size must be at least 2")
+        self.max_input_length = max_input_length
+        self.chunk_size = chunk_size
+        
+        self.lexicon_shards = LexiconShardCache(max_shards=max_lexicon_shards)
+        if languages is None:
+            languages = ['en'] + self.lexicon_shards.available_languages()
+        self.language_identifier = LanguageIdentifier(languages)
+        
+        # Heavy NLP modules are imported on first analysis (or by warm_up) so
+        # that importing this module and rendering the first page stay cheap
+        self.stop_words = set()
+        self.sia = None
+        self._textblob = None
+        self._nlp_loaded = False
+        self._nlp_lock = threading.Lock()
+        self._warmup_thread = None
+        
+        # Optional SlowRequestProfiler (see slow_request_profiler.py)
+        self.profiler = None
+        
+        # Emotion scoring engine for English text (see engines.py)
+        self.engine = KeywordEngine(self)
         
         # Define emotion keywords and patterns
         self.emotion_keywords = {
@@ -69,41 +95,136 @@ class EmotionDetector:
             ]
         }
         
-        # Compile regex patterns for faster matching
-        self.emotion_patterns = {}
+        # All keywords in one alternation so the text is scanned once, not once
+        # per emotion; a keyword can count for several emotions ('disgusted')
+        self.keyword_emotions = defaultdict(list)
         for emotion, keywords in self.emotion_keywords.items():
-            pattern = r'\b(' + '|'.join(keywords) + r')\b'
-            self.emotion_patterns[emotion] = re.compile(pattern, re.IGNORECASE)
+            for keyword in keywords:
+                self.keyword_emotions[keyword].append(emotion)
+        keywords = sorted(self.keyword_emotions, key=len, reverse=True)
+        self.keyword_pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + r')\b', re.IGNORECASE)
+    
+    @property
+    def nlp_loaded(self):
+        """Whether NLTK, VADER and TextBlob have been loaded"""
+        return self._nlp_loaded
+    
+    def load_nlp(self):
+        """Load NLTK data, VADER and TextBlob on first use"""
+        if self._nlp_loaded:
+            return
+        
+        with self._nlp_lock:
+            if self._nlp_loaded:
+                return
+            
+            try:
+                import nltk
+                
+                # Download required NLTK data
+                nltk.download('punkt', quiet=True)
+                nltk.download('stopwords', quiet=True)
+                nltk.download('vader_lexicon', quiet=True)
+                nltk.download('wordnet', quiet=True)
+                
+                from nltk.corpus import stopwords
+                from nltk.sentiment import SentimentIntensityAnalyzer
+                
+                self.stop_words = set(stopwords.words('english'))
+                self.sia = SentimentIntensityAnalyzer()
+                
+            except Exception as e:
+                print(f"Warning: NLTK setup failed: {e}")
+                self.stop_words = set()
+                self.sia = None
+            
+            try:
+                from textblob import TextBlob
+                self._textblob = TextBlob
+            except Exception as e:
+                print(f"Warning: TextBlob setup failed: {e}")
+                self._textblob = None
+            
+            self._nlp_loaded = True
+    
+    def warm_up(self, background=True):
+        """Preload the NLP modules, by default in a daemon thread"""
+        if self._nlp_loaded:
+            return None
+        
+        if not background:
+            self.load_nlp()
+            return None
+        
+        with self._nlp_lock:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(
+                    target=self.load_nlp, name='feelbot-nlp-warmup', daemon=True
+                )
+                self._warmup_thread.start()
+        return self._warmup_thread
     
     def preprocess_text(self, text):
         """Preprocess text for emotion analysis"""
+        return self.preprocess_with_signals(text)[0]
+    
+    def preprocess_with_signals(self, text):
+        """Preprocess text and collect emoji/emoticon signals before they are stripped"""
         # Convert to lowercase and remove extra whitespace
         text = re.sub(r'\s+', ' ', text.lower().strip())
         
-        # Remove URLs, mentions, and hashtags (social media preprocessing)
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+        # Remove URLs, mentions, and hashtags (social media preprocessing).
+        # One character class accepting the same characters as the old
+        # alternation of classes and %-escapes, without the backtracking.
+        text = re.sub(r'http[s]?://[$-_a-zA-Z!]+', '', text)
         text = re.sub(r'@\w+', '', text)
         text = re.sub(r'#\w+', '', text)
         
+        # Emojis and emoticons are strong emotion signals, so read them first
+        emoji_signals = extract_emoji_signals(text)
+        
         # Remove excessive punctuation but keep emotional punctuation
         text = re.sub(r'[^\w\s!?.,;:\'"()-]', '', text)
         
-        return text
+        return text, emoji_signals
     
-    def calculate_emotion_scores(self, text):
+    def calculate_emotion_scores(self, text, shard=None):
         """Calculate emotion scores based on keyword matching"""
-        processed_text = self.preprocess_text(text)
+        return self.scores_from_matches(*self.count_emotion_matches(text, shard))
+    
+    def count_emotion_matches(self, text, shard=None):
+        """Return (matches per emotion, word count, processed text) before any normalization
+        
+        Counts from several chunks of one message can be summed and passed to
+        scores_from_matches, which scores them as if the message were one text.
+        """
+        processed_text, emoji_signals = self.preprocess_with_signals(text)
+        
+        # Non-English text is matched against its language shard
+        lexicon = shard if shard is not None else self
+        
+        # Count emotion keyword matches plus weighted emoji/emoticon signals
+        keyword_counts = defaultdict(int)
+        for keyword in lexicon.keyword_pattern.findall(processed_text):
+            for emotion in lexicon.keyword_emotions[keyword.lower()]:
+                keyword_counts[emotion] += 1
+        
+        matches = {}
+        for emotion in self.emotion_keywords:
+            count = keyword_counts[emotion] + emoji_signals.get(emotion, 0.0)
+            if count:
+                matches[emotion] = count
+        return matches, len(processed_text.split()), processed_text
+    
+    def scores_from_matches(self, matches, word_count, processed_text):
+        """Turn match counts into normalized, boosted emotion scores"""
         emotion_scores = defaultdict(float)
         total_matches = 0
         
-        # Count emotion keyword matches
-        for emotion, pattern in self.emotion_patterns.items():
-            matches = pattern.findall(processed_text)
-            if matches:
-                # Weight by frequency and adjust for text length
-                score = len(matches) / max(1, len(processed_text.split()) * 0.1)
-                emotion_scores[emotion] = score
-                total_matches += len(matches)
+        for emotion, count in matches.items():
+            # Weight by frequency and adjust for text length
+            emotion_scores[emotion] = count / max(1, word_count * 0.1)
+            total_matches += count
         
         # Normalize scores
         if total_matches > 0:
@@ -138,8 +259,8 @@ class EmotionDetector:
                 if emotion in emotion_scores:
                     emotion_scores[emotion] *= boost_factor
         
-        # Repeated letters indicate strong emotion
-        repeated_letters = re.findall(r'(.)\1{2,}', text)
+        # Repeated letters indicate strong emotion (one hit is enough)
+        repeated_letters = re.search(r'(.)\1{2,}', text)
         if repeated_letters:
             boost_factor = 1.2
             for emotion in emotion_scores:
@@ -147,14 +268,18 @@ class EmotionDetector:
         
         return emotion_scores
     
-    def get_sentiment_analysis(self, text):
+    def get_sentiment_analysis(self, text, use_textblob=True):
         """Get sentiment analysis using TextBlob and NLTK's VADER"""
-        # TextBlob sentiment
-        try:
-            blob = TextBlob(text)
-            textblob_polarity = blob.sentiment.polarity
-        except Exception as e:
-            textblob_polarity = 0.0
+        self.load_nlp()
+        
+        # TextBlob sentiment (skipped in the cheaper degraded modes)
+        textblob_polarity = 0.0
+        if use_textblob:
+            try:
+                blob = self._textblob(text)
+                textblob_polarity = blob.sentiment.polarity
+            except Exception as e:
+                textblob_polarity = 0.0
         
         # VADER sentiment (if available)
         vader_sentiment = None
@@ -166,27 +291,135 @@ class EmotionDetector:
                 pass
         
         # Combine or use TextBlob as fallback
-        if vader_sentiment is not None:
+        if vader_sentiment is not None and not use_textblob:
+            combined_score = vader_sentiment
+        elif vader_sentiment is not None:
             # Average the two approaches
             combined_score = (textblob_polarity + vader_sentiment) / 2
         else:
             combined_score = textblob_polarity
         
-        # Classify sentiment
-        if combined_score >= 0.1:
-            sentiment = 'positive'
-        elif combined_score <= -0.1:
-            sentiment = 'negative'
-        else:
-            sentiment = 'neutral'
-        
         return {
-            'sentiment': sentiment,
+            'sentiment': self.classify_polarity(combined_score),
             'polarity_score': combined_score,
             'textblob_score': textblob_polarity,
             'vader_score': vader_sentiment
         }
     
+    def classify_polarity(self, score):
+        """Map a polarity score to positive/negative/neutral"""
+        if score >= 0.1:
+            return 'positive'
+        elif score <= -0.1:
+            return 'negative'
+        return 'neutral'
+    
+    def split_into_chunks(self, text):
+        """Split text into chunks of at most chunk_size characters, at whitespace where possible"""
+        chunks = []
+        start = 0
+        while len(text) - start > self.chunk_size:
+            low, high = start + self.chunk_size // 2, start + self.chunk_size
+            end = max(text.rfind(' ', low, high), text.rfind('\n', low, high))
+            if end == -1:
+                end = high
+            chunks.append(text[start:end])
+            start = end
+        chunks.append(text[start:])
+        return chunks
+    
+    def route_language(self, text):
+        """Return (language, shard); shard is None for the default English pipeline"""
+        default = self.language_identifier.default
+        language = self.language_identifier.detect(text)
+        if language == default:
+            return default, None
+        
+        shard = self.lexicon_shards.get(language)
+        if shard is None:
+            return default, None
+        
+        # A shard with nothing to match would make the message neutral; if the
+        # English keywords do match, the language guess was most likely wrong
+        if shard.keyword_pattern.search(text) is None and self.keyword_pattern.search(text) is not None:
+            return default, None
+        return language, shard
+    
+    def score_chunk(self, text, mode, shard=None, emotion_scores=None):
+        """Return (emotion_scores, sentiment_data) for one chunk of text"""
+        if mode == 'sentiment':
+            emotion_scores = {}
+        elif shard is not None:
+            emotion_scores = self.calculate_emotion_scores(text, shard)
+        elif emotion_scores is None:
+            emotion_scores = self.engine.score_batch([text])[0]
+        
+        return emotion_scores, self.chunk_sentiment(text, mode, shard)
+    
+    def chunk_sentiment(self, text, mode, shard=None):
+        """Return sentiment_data for one chunk of text"""
+        if mode == 'keyword':
+            return {'sentiment': 'neutral', 'polarity_score': 0.0}
+        if shard is not None:
+            # VADER and TextBlob are English-only, so use the shard's lexicon
+            polarity = shard.polarity_score(text)
+            return {
+                'sentiment': self.classify_polarity(polarity),
+                'polarity_score': polarity,
+                'lexicon_score': polarity
+            }
+        return self.get_sentiment_analysis(text, use_textblob=(mode == 'full'))
+    
+    def score_chunks(self, chunks, mode, shard=None):
+        """Return (emotion_scores, sentiment_data) for a message analyzed in chunks"""
+        if mode == 'sentiment':
+            emotion_scores = {}
+        elif shard is not None or isinstance(self.engine, KeywordEngine):
+            # Keyword scores are normalized by word count and boosted once per
+            # text, so sum the raw matches of all chunks and score them together
+            matches = defaultdict(float)
+            word_count = 0
+            processed_chunks = []
+            for chunk in chunks:
+                chunk_matches, chunk_words, processed_chunk = self.count_emotion_matches(chunk, shard)
+                for emotion, count in chunk_matches.items():
+                    matches[emotion] += count
+                word_count += chunk_words
+                processed_chunks.append(processed_chunk)
+            emotion_scores = self.scores_from_matches(matches, word_count, ' '.join(processed_chunks))
+        else:
+            # Model engines give per-chunk probabilities; weight them by length
+            emotion_scores = defaultdict(float)
+            total_length = sum(len(chunk) for chunk in chunks)
+            for chunk, chunk_scores in zip(chunks, self.engine.score_batch(chunks)):
+                for emotion, score in chunk_scores.items():
+                    emotion_scores[emotion] += score * len(chunk) / total_length
+            emotion_scores = dict(emotion_scores)
+        
+        sentiment_data = self.merge_chunk_sentiment(
+            chunks, [self.chunk_sentiment(chunk, mode, shard) for chunk in chunks]
+        )
+        return emotion_scores, sentiment_data
+    
+    def merge_chunk_sentiment(self, chunks, chunk_sentiments):
+        """Merge per-chunk sentiment, weighting each chunk by its length"""
+        total_length = sum(len(chunk) for chunk in chunks)
+        sentiment_data = {}
+        
+        for chunk, chunk_sentiment in zip(chunks, chunk_sentiments):
+            weight = len(chunk) / total_length
+            for key in ('polarity_score', 'textblob_score', 'vader_score', 'lexicon_score'):
+                if key not in chunk_sentiment:
+                    continue
+                value = chunk_sentiment[key]
+                if value is None or sentiment_data.get(key, 0.0) is None:
+                    sentiment_data[key] = None
+                else:
+                    sentiment_data[key] = sentiment_data.get(key, 0.0) + value * weight
+        
+        sentiment_data['sentiment'] = self.classify_polarity(sentiment_data['polarity_score'])
+        return sentiment_data
+    
     def determine_primary_emotion(self, emotion_scores, sentiment_data):
         """Determine the primary emotion from scores and sentiment"""
         if not emotion_scores:
@@ -215,23 +448,68 @@ class EmotionDetector:
         
         return primary_emotion
     
-    def analyze_text(self, text):
-        """Main method to analyze text for emotions and sentiment"""
+    def analyze_text(self, text, mode='full', emotion_scores=None):
+        """Main method to analyze text for emotions and sentiment
+        
+        `mode` selects how much of the pipeline runs: 'full' (keywords,
+        TextBlob and VADER), 'keyword' (keyword matching only) or
+        'sentiment' (VADER only). The cheaper modes are used by the
+        overload controller in load_shedding.py. `emotion_scores` lets
+        analyze_batch pass in scores the engine already computed.
+        """
+        if mode not in self.ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        
+        if self.profiler is not None:
+            with self.profiler.track(text or '', mode):
+                return self._analyze_text(text, mode, emotion_scores)
+        return self._analyze_text(text, mode, emotion_scores)
+    
+    def analyze_batch(self, texts, mode='full'):
+        """Analyze several messages, letting a batched engine score them together"""
+        if mode not in self.ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        
+        precomputed = {}
+        if self.engine.batched and mode != 'sentiment':
+            # Single-chunk messages are scored in one vectorized engine call
+            batch = [i for i, text in enumerate(texts)
+                     if text and text.strip() and len(text) <= self.chunk_size]
+            try:
+                scores = self.engine.score_batch([texts[i] for i in batch])
+                precomputed = dict(zip(batch, scores))
+            except Exception as e:
+                print(f"Warning: batched emotion scoring failed: {e}")
+        
+        return [self.analyze_text(text, mode, precomputed.get(i)) for i, text in enumerate(texts)]
+    
+    def _analyze_text(self, text, mode, precomputed_scores=None):
         if not text or not text.strip():
             return {
                 'primary_emotion': 'neutral',
                 'emotion_scores': {},
                 'sentiment': 'neutral',
                 'sentiment_data': {'sentiment': 'neutral', 'polarity_score': 0.0},
-                'confidence': 0.0
+                'confidence': 0.0,
+                'mode': mode,
+                'language': self.language_identifier.default
             }
         
+        # Guard against huge pastes: cap the length, then analyze in chunks
+        truncated = len(text) > self.max_input_length
+        if truncated:
+            text = text[:self.max_input_length]
+        
         try:
-            # Get emotion scores
-            emotion_scores = self.calculate_emotion_scores(text)
+            # Pick the lexicon for the message's language
+            language, shard = self.route_language(text)
             
-            # Get sentiment analysis
-            sentiment_data = self.get_sentiment_analysis(text)
+            # Get emotion scores and sentiment analysis
+            chunks = self.split_into_chunks(text)
+            if len(chunks) == 1:
+                emotion_scores, sentiment_data = self.score_chunk(text, mode, shard, precomputed_scores)
+            else:
+                emotion_scores, sentiment_data = self.score_chunks(chunks, mode, shard)
             
             # Determine primary emotion
             primary_emotion = self.determine_primary_emotion(emotion_scores, sentiment_data)
@@ -243,13 +521,18 @@ class EmotionDetector:
             else:
                 confidence = abs(sentiment_data['polarity_score']) * 0.7
             
-            return {
+            result = {
                 'primary_emotion': primary_emotion,
                 'emotion_scores': emotion_scores,
                 'sentiment': sentiment_data['sentiment'],
                 'sentiment_data': sentiment_data,
-                'confidence': confidence
+                'confidence': confidence,
+                'mode': mode,
+                'language': language
             }
+            if truncated:
+                result['truncated'] = True
+            return result
             
         except Exception as e:
             # Return neutral analysis on error
@@ -259,5 +542,7 @@ class EmotionDetector:
                 'sentiment': 'neutral',
                 'sentiment_data': {'sentiment': 'neutral', 'polarity_score': 0.0},
                 'confidence': 0.0,
+                'mode': mode,
+                'language': self.language_identifier.default,
                 'error': str(e)
             }
@@ -0,0 +1,33 @@
+import os
+
+class KeywordEngine:
+    """Default emotion engine: the keyword, emoji and booster rules in EmotionDetector"""
+    name = 'keyword'
+    # Scoring a list is no cheaper than scoring messages one by one
+    batched = False
+    
+    def __init__(self, emotion_detector):
+        self.emotion_detector = emotion_detector
+    
+    def score_batch(self, texts):
+        """Return one emotion_scores dict per text"""
+        return [self.emotion_detector.calculate_emotion_scores(text) for text in texts]
+
+def create_engine(name, emotion_detector, model_dir=None):
+    """Build the named emotion engine ('keyword' or 'ngram')"""
+    if name == 'keyword':
+        return KeywordEngine(emotion_detector)
+    if name == 'ngram':
+        # Imported here so NumPy is only loaded when the engine is used
+        from ngram_engine import DEFAULT_MODEL_DIR, HashedNgramEngine
+        return HashedNgramEngine(model_dir or DEFAULT_MODEL_DIR)
+    raise ValueError(f"Unknown emotion engine: {name}")
+
+def create_engine_from_env(emotion_detector):
+    """Build the engine named by FEELBOT_ENGINE, falling back to the keyword engine"""
+    name = os.environ.get('FEELBOT_ENGINE', 'keyword')
+    try:
+        return create_engine(name, emotion_detector, os.environ.get('FEELBOT_MODEL_DIR'))
+    except Exception as e:
+        print(f"Warning: could not load the '{name}' engine, using keywords: {e}")
+        return KeywordEngine(emotion_detector)
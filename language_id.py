@@ -0,0 +1,178 @@
+import math
+import re
+from collections import Counter
+
+# Samples of everyday chat text per language, emotional messages included. At
+# import time they are turned into a character-trigram log-probability table,
+# which is all the identifier needs at runtime.
+LANGUAGE_SAMPLES = {
+    'en': (
+        "i am so happy today and i want to tell you about it. what are you doing this weekend? "
+        "i think that this is the best thing that has happened to me in a long time. "
+        "she said she would be there with them but they were not sure. it was really "
+        "nice of you to help me with the work, thank you so much. why do i feel this way "
+        "when everything is going well? my friends and my family have been with me through "
+        "all of this and i have been thinking about what should happen next. "
+        "i'm so angry and frustrated right now, my boss keeps yelling at me and it is not fair. "
+        "honestly i feel terrible and really miserable, like nothing is going right anymore. "
+        "that was an incredible and unbelievable performance, i was so surprised and excited! "
+        "i'm scared and nervous about the exam tomorrow, i can't stop worrying about it. "
+        "this food is disgusting and the whole place smells awful, never again. i miss my "
+        "friends so much and i feel lonely without them. we should get together soon, maybe "
+        "tonight after work? let me know if you need anything, i'll be around all day."
+    ),
+    'es': (
+        "estoy muy feliz hoy y quiero contarte lo que pasó. qué vas a hacer este fin de semana? "
+        "creo que es lo mejor que me ha pasado en mucho tiempo. ella dijo que estaría allí con "
+        "ellos pero no estaban seguros. fue muy amable de tu parte ayudarme con el trabajo, "
+        "muchas gracias. por qué me siento así cuando todo va bien? mis amigos y mi familia "
+        "han estado conmigo en todo esto y he estado pensando en lo que debería pasar después. "
+        "estoy muy enojado y frustrado ahora mismo, mi jefe no deja de gritarme y no es justo. "
+        "la verdad me siento fatal y muy triste, como si nada saliera bien. fue una actuación "
+        "increíble, no me lo esperaba para nada! tengo miedo y estoy nerviosa por el examen "
+        "de mañana, no puedo dejar de preocuparme. esta comida es asquerosa y el lugar huele "
+        "horrible, nunca más. extraño mucho a mis amigos y me siento sola sin ellos. deberíamos "
+        "vernos pronto, quizás esta noche después del trabajo? avísame si necesitas algo."
+    ),
+    'fr': (
+        "je suis très heureux aujourd'hui et je veux te raconter ce qui s'est passé. qu'est-ce "
+        "que tu fais ce week-end? je pense que c'est la meilleure chose qui me soit arrivée "
+        "depuis longtemps. elle a dit qu'elle serait là avec eux mais ils n'étaient pas sûrs. "
+        "c'était très gentil de ta part de m'aider avec le travail, merci beaucoup. pourquoi "
+        "je me sens comme ça quand tout va bien? mes amis et ma famille ont été avec moi. "
+        "j'ai peur de l'avenir, j'ai besoin de parler avec quelqu'un demain. "
+        "je suis tellement en colère et frustré en ce moment, mon patron n'arrête pas de crier "
+        "et ce n'est pas juste. franchement je me sens mal et vraiment triste, comme si rien "
+        "n'allait plus. c'était une performance incroyable, je ne m'y attendais pas du tout! "
+        "j'ai peur et je suis nerveuse pour l'examen de demain, je n'arrête pas de m'inquiéter. "
+        "cette nourriture est dégoûtante et l'endroit sent mauvais, plus jamais. mes amis me "
+        "manquent beaucoup et je me sens seule sans eux. on devrait se voir bientôt, peut-être "
+        "ce soir après le boulot? dis-moi si tu as besoin de quoi que ce soit."
+    ),
+    'de': (
+        "ich bin heute so glücklich und ich will dir erzählen, was passiert ist. was machst du "
+        "an diesem wochenende? ich glaube, dass das das beste ist, was mir seit langer zeit "
+        "passiert ist. sie sagte, sie würde mit ihnen dort sein, aber sie waren nicht sicher. "
+        "es war sehr nett von dir, mir bei der arbeit zu helfen, vielen dank. warum fühle ich "
+        "mich so, wenn alles gut läuft? meine freunde und meine familie waren immer bei mir. "
+        "ich bin gerade so wütend und frustriert, mein chef schreit mich ständig an und das ist "
+        "nicht fair. ehrlich gesagt fühle ich mich schrecklich und wirklich traurig, als ob "
+        "nichts mehr klappt. das war eine unglaubliche leistung, damit habe ich überhaupt nicht "
+        "gerechnet! ich habe angst und bin nervös wegen der prüfung morgen, ich mache mir "
+        "ständig sorgen. dieses essen ist ekelhaft und der ganze laden stinkt, nie wieder. "
+        "ich vermisse meine freunde so sehr und fühle mich einsam ohne sie. wir sollten uns "
+        "bald treffen, vielleicht heute abend nach der arbeit? sag mir, wenn du etwas brauchst."
+    ),
+    'pt': (
+        "estou muito feliz hoje e quero te contar o que aconteceu. o que você vai fazer neste "
+        "fim de semana? acho que é a melhor coisa que me aconteceu em muito tempo. ela disse "
+        "que estaria lá com eles mas eles não tinham certeza. foi muito gentil da sua parte me "
+        "ajudar com o trabalho, muito obrigado. por que eu me sinto assim quando tudo vai bem? "
+        "meus amigos e minha família estiveram comigo em tudo isso e não sei o que fazer. "
+        "estou com muita raiva e frustrado agora, meu chefe não para de gritar comigo e não é "
+        "justo. sinceramente me sinto péssimo e muito triste, como se nada desse certo. foi "
+        "uma apresentação incrível, eu não esperava nada disso! estou com medo e nervosa com "
+        "a prova de amanhã, não consigo parar de me preocupar. essa comida é nojenta e o lugar "
+        "cheira mal, nunca mais. sinto muita saudade dos meus amigos e me sinto sozinha sem "
+        "eles. a gente devia se ver logo, talvez hoje à noite depois do trabalho? me avisa se "
+        "você precisar de alguma coisa."
+    ),
+    'it': (
+        "sono così felice oggi e voglio raccontarti cosa è successo. cosa fai questo fine "
+        "settimana? penso che sia la cosa migliore che mi sia successa da molto tempo. lei ha "
+        "detto che sarebbe stata lì con loro ma non erano sicuri. è stato molto gentile da "
+        "parte tua aiutarmi con il lavoro, grazie mille. perché mi sento così quando tutto va "
+        "bene? i miei amici e la mia famiglia sono stati con me in tutto questo. ho "
+        "paura dell'esame di domani, ho bisogno di parlare con qualcuno. "
+        "sono così arrabbiato e frustrato adesso, il mio capo continua a urlarmi contro e non "
+        "è giusto. sinceramente mi sento malissimo e molto triste, come se niente andasse "
+        "bene. è stata un'esibizione incredibile, non me lo aspettavo proprio! ho paura e sono "
+        "nervosa per l'esame di domani, non riesco a smettere di preoccuparmi. questo cibo è "
+        "disgustoso e il locale puzza, mai più. mi mancano tanto i miei amici e mi sento sola "
+        "senza di loro. dovremmo vederci presto, magari stasera dopo il lavoro? fammi sapere "
+        "se hai bisogno di qualcosa."
+    ),
+}
+
+_WORDS = re.compile(r'[^\W\d_]+')
+
+def _trigrams(text):
+    """Yield character trigrams of each word, padded with spaces"""
+    for word in _WORDS.findall(text.lower()):
+        padded = f' {word} '
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3]
+
+def build_trigram_table(samples):
+    """Return ({trigram: {language: log_prob}}, {language: log_prob_of_unseen})"""
+    table = {}
+    unseen = {}
+    for language, sample in samples.items():
+        counts = Counter(_trigrams(sample))
+        # Add-one smoothing over the trigrams seen in this language
+        total = sum(counts.values()) + len(counts) + 1
+        unseen[language] = math.log(1 / total)
+        for trigram, count in counts.items():
+            table.setdefault(trigram, {})[language] = math.log((count + 1) / total)
+    return table, unseen
+
+TRIGRAM_TABLE, UNSEEN_LOG_PROB = build_trigram_table(LANGUAGE_SAMPLES)
+
+class LanguageIdentifier:
+    def __init__(self, languages=None, default='en', max_chars=300, min_trigrams=10, min_margin=0.3,
+                 short_text_trigrams=40, short_text_margin=0.6):
+        """Character-trigram language identifier over a fixed set of languages
+        
+        Only the first `max_chars` characters are scored, so the cost is
+        bounded. Text with fewer than `min_trigrams` trigrams, or where the best
+        language does not beat the default by `min_margin` nats per trigram,
+        is assigned the default language. Text with fewer than
+        `short_text_trigrams` trigrams must win by `short_text_margin` instead,
+        since a few repeated English words can look foreign by chance.
+        """
+        self.languages = [lang for lang in (languages or LANGUAGE_SAMPLES) if lang in LANGUAGE_SAMPLES]
+        if default not in self.languages:
+            self.languages.append(default)
+        self.default = default
+        self.max_chars = max_chars
+        self.min_trigrams = min_trigrams
+        self.min_margin = min_margin
+        self.short_text_trigrams = short_text_trigrams
+        self.short_text_margin = short_text_margin
+        
+        # One row of log-probs per trigram, aligned with self.languages
+        self._unseen_row = tuple(UNSEEN_LOG_PROB[lang] for lang in self.languages)
+        self._table = {
+            trigram: tuple(probs.get(lang, UNSEEN_LOG_PROB[lang]) for lang in self.languages)
+            for trigram, probs in TRIGRAM_TABLE.items()
+        }
+    
+    def scores(self, text):
+        """Return the mean log-probability per trigram for each language"""
+        return self._score_trigrams(list(_trigrams(text[:self.max_chars])))
+    
+    def _score_trigrams(self, trigrams):
+        if not trigrams:
+            return {}
+        
+        table, unseen_row = self._table, self._unseen_row
+        totals = [0.0] * len(self.languages)
+        for trigram in trigrams:
+            totals = [t + p for t, p in zip(totals, table.get(trigram, unseen_row))]
+        return {lang: total / len(trigrams) for lang, total in zip(self.languages, totals)}
+    
+    def detect(self, text):
+        """Return the language code of the text"""
+        if len(self.languages) == 1:
+            return self.default
+        
+        trigrams = list(_trigrams(text[:self.max_chars]))
+        if len(trigrams) < self.min_trigrams:
+            return self.default
+        
+        scores = self._score_trigrams(trigrams)
+        best = max(scores, key=scores.get)
+        margin = self.short_text_margin if len(trigrams) < self.short_text_trigrams else self.min_margin
+        if best != self.default and scores[best] - scores[self.default] < margin:
+            return self.default
+        return best
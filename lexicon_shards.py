@@ -0,0 +1,81 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+
+LEXICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicons')
+
+class LexiconShard:
+    def __init__(self, language, emotion_keywords, polarity, name=None):
+        """Emotion keywords and a word-polarity lexicon for one language, compiled for matching"""
+        self.language = language
+        self.name = name or language
+        self.emotion_keywords = emotion_keywords
+        self.polarity = {word.lower(): score for word, score in polarity.items()}
+        
+        # Same matching scheme as EmotionDetector's English keywords
+        self.keyword_emotions = defaultdict(list)
+        for emotion, keywords in emotion_keywords.items():
+            for keyword in keywords:
+                self.keyword_emotions[keyword.lower()].append(emotion)
+        keywords = sorted(self.keyword_emotions, key=len, reverse=True)
+        self.keyword_pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + r')\b', re.IGNORECASE)
+        self.word_pattern = re.compile(r'[^\W\d_]+')
+    
+    @classmethod
+    def load(cls, path):
+        """Load a shard from a JSON file"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['language'], data['emotion_keywords'], data.get('polarity', {}), data.get('name'))
+    
+    def polarity_score(self, text):
+        """Mean polarity of the lexicon words in the text, in [-1, 1]"""
+        scores = [self.polarity[word] for word in self.word_pattern.findall(text.lower()) if word in self.polarity]
+        if not scores:
+            return 0.0
+        return max(-1.0, min(1.0, sum(scores) / len(scores)))
+
+class LexiconShardCache:
+    def __init__(self, max_shards=4, directory=LEXICON_DIR):
+        """Load language shards on first use and keep at most `max_shards` in memory (LRU)"""
+        self.max_shards = max_shards
+        self.directory = directory
+        self._shards = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def available_languages(self):
+        """Language codes that have a shard file"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith('.json'))
+    
+    def get(self, language):
+        """Return the shard for a language, or None if there is no shard file"""
+        with self._lock:
+            shard = self._shards.get(language)
+            if shard is not None:
+                self._shards.move_to_end(language)
+                return shard
+        
+        path = os.path.join(self.directory, f'{language}.json')
+        if not os.path.isfile(path):
+            return None
+        try:
+            shard = LexiconShard.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: could not load lexicon shard {path}: {e}")
+            return None
+        
+        with self._lock:
+            self._shards[language] = shard
+            self._shards.move_to_end(language)
+            while len(self._shards) > self.max_shards:
+                self._shards.popitem(last=False)
+        return shard
+    
+    def loaded_languages(self):
+        """Languages currently held in memory, least recently used first"""
+        with self._lock:
+            return list(self._shards)
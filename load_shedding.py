@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import deque
+
+class OverloadController:
+    def __init__(self, emotion_detector, max_queue_depth=8, latency_budget_ms=250.0,
+                 window_size=200, min_samples=20, min_slow_samples=3, recovery_samples=200,
+                 recovery_seconds=30.0, clock=time.monotonic):
+        """Wrap an EmotionDetector and degrade to cheaper modes under overload
+        
+        The controller watches the number of in-flight requests and the p99
+        latency of recent requests. When either goes over its limit it steps
+        down one mode (full -> keyword -> sentiment). A latency trip needs at
+        least `min_slow_samples` over-budget requests in the window, so one
+        outlier cannot demote the service. Once both signals have stayed well
+        under their limits for `recovery_samples` requests or
+        `recovery_seconds`, whichever comes first, it steps back up; an idle
+        gap counts as calm time. `clock` returns seconds and can be replaced
+        in simulations.
+        """
+        self.emotion_detector = emotion_detector
+        self.modes = emotion_detector.ANALYSIS_MODES
+        self.max_queue_depth = max_queue_depth
+        self.latency_budget_ms = latency_budget_ms
+        self.min_samples = min_samples
+        self.min_slow_samples = min_slow_samples
+        self.recovery_samples = recovery_samples
+        self.recovery_seconds = recovery_seconds
+        self.clock = clock
+        
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window_size)
+        self._level = 0
+        self._in_flight = 0
+        self._since_change = 0
+        self._calm_streak = 0
+        self._calm_since = None
+        self._last_arrival = None
+        self._mode_counts = {mode: 0 for mode in self.modes}
+    
+    @property
+    def current_mode(self):
+        """The mode new requests are currently served in"""
+        return self.modes[self._level]
+    
+    def latency_percentile(self, percentile):
+        """Return the given percentile (0-100) of recent latencies in ms"""
+        with self._lock:
+            return self._percentile_locked(percentile)
+    
+    def _percentile_locked(self, percentile):
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+    
+    def _set_level_locked(self, level):
+        if level != self._level:
+            self._level = level
+            # Latencies from the previous mode say nothing about the new one
+            self._latencies.clear()
+            self._since_change = 0
+            self._calm_streak = 0
+            self._calm_since = None
+    
+    def select_mode(self, queue_depth):
+        """Pick the mode for a request arriving with `queue_depth` requests in flight"""
+        with self._lock:
+            now = self.clock()
+            self._recover_after_idle_locked(now, queue_depth)
+            self._last_arrival = now
+            
+            self._since_change += 1
+            p99 = self._percentile_locked(99)
+            enough_samples = len(self._latencies) >= self.min_samples
+            
+            # A deep queue escalates as soon as the current mode has seen a
+            # queue's worth of arrivals; slow latencies need `min_samples`
+            # and a real tail, not a single outlier
+            queue_overloaded = (queue_depth > self.max_queue_depth
+                                and self._since_change >= self.max_queue_depth)
+            latency_overloaded = (
+                enough_samples and p99 > self.latency_budget_ms
+                and self._since_change >= self.min_samples
+                and sum(1 for latency in self._latencies if latency > self.latency_budget_ms) >= self.min_slow_samples
+            )
+            calm = queue_depth <= self.max_queue_depth // 2 and (
+                not enough_samples or p99 < self.latency_budget_ms / 2
+            )
+            
+            if queue_overloaded or latency_overloaded:
+                self._set_level_locked(min(self._level + 1, len(self.modes) - 1))
+            elif calm and self._level > 0:
+                self._calm_streak += 1
+                if self._calm_since is None:
+                    self._calm_since = now
+                if (self._calm_streak >= self.recovery_samples
+                        or now - self._calm_since >= self.recovery_seconds):
+                    self._set_level_locked(self._level - 1)
+            else:
+                self._calm_streak = 0
+                self._calm_since = None
+            
+            mode = self.modes[self._level]
+            self._mode_counts[mode] += 1
+            return mode
+    
+    def _recover_after_idle_locked(self, now, queue_depth):
+        # No arrivals means no load: step up one mode per quiet recovery period
+        if self._last_arrival is None or self._level == 0 or queue_depth > self.max_queue_depth // 2:
+            return
+        quiet_periods = int((now - self._last_arrival) / self.recovery_seconds)
+        if quiet_periods:
+            self._set_level_locked(max(0, self._level - quiet_periods))
+    
+    def record_latency(self, latency_ms):
+        """Record the end-to-end latency of a finished request"""
+        with self._lock:
+            self._latencies.append(latency_ms)
+    
+    def analyze_text(self, text):
+        """Analyze text in whichever mode the current load allows"""
+        return self.analyze_batch([text])[0]
+    
+    def analyze_batch(self, texts):
+        """Analyze a batch of messages in one mode chosen for the current load"""
+        with self._lock:
+            self._in_flight += len(texts)
+            queue_depth = self._in_flight
+        
+        nlp_was_loaded = self.emotion_detector.nlp_loaded
+        start = time.perf_counter()
+        try:
+            mode = self.select_mode(queue_depth)
+            return self.emotion_detector.analyze_batch(texts, mode=mode)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._in_flight -= len(texts)
+            # Requests that waited for the one-off NLP load say nothing about load
+            if nlp_was_loaded or not self.emotion_detector.nlp_loaded:
+                # Every message in the batch waited for the whole batch
+                for _ in texts:
+                    self.record_latency(elapsed_ms)
+    
+    def stats(self):
+        """Return a snapshot of the controller state"""
+        with self._lock:
+            return {
+                'mode': self.modes[self._level],
+                'in_flight': self._in_flight,
+                'p50_ms': self._percentile_locked(50),
+                'p99_ms': self._percentile_locked(99),
+                'mode_counts': dict(self._mode_counts)
+            }
@@ -0,0 +1,194 @@
+"""Hashed word n-gram linear emotion model (pure NumPy).
+
+Train offline on a local labeled file with one `label<TAB>text` example per
+line (labels such as joy, anger, fear, sadness, surprise, disgust, neutral):
+    
+    python ngram_engine.py train data/emotions.tsv models/ngram
+
+The model directory holds weights.npy, bias.npy and meta.json. Weights are
+opened with mmap_mode='r', so every process that loads the same model shares
+one copy through the OS page cache.
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import zlib
+
+import numpy as np
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'ngram')
+EMOTIONS = ('joy', 'anger', 'fear', 'sadness', 'surprise', 'disgust')
+
+_TOKENS = re.compile(r"[\w']+|[^\w\s]")
+_ELONGATION = re.compile(r'(.)\1{2,}')
+
+def featurize(text, n_buckets):
+    """Hash the word unigrams and bigrams of a text into bucket indices"""
+    # 'sooooo' and 'soo' share features
+    tokens = _TOKENS.findall(_ELONGATION.sub(r'\1\1', text.lower()))
+    features = [f'w:{token}' for token in tokens]
+    features += [f'b:{a} {b}' for a, b in zip(tokens, tokens[1:])]
+    mask = n_buckets - 1
+    return [zlib.crc32(feature.encode('utf-8')) & mask for feature in features]
+
+def _segment_logits(weights, bias, rows):
+    """Logits for a batch of feature rows, with one vectorized segment sum
+    
+    Returns (logits, indices, lengths, scale) so training can reuse the
+    flattened layout for its gradient.
+    """
+    lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    indices = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=int(lengths.sum()))
+    # Scale by 1/sqrt(length) so long messages do not get extreme logits
+    scale = 1.0 / np.sqrt(np.maximum(lengths, 1)).astype(np.float32)
+    
+    logits = np.zeros((len(rows), weights.shape[1]), dtype=np.float32)
+    nonempty = lengths > 0
+    if indices.size:
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        logits[nonempty] = np.add.reduceat(weights[indices], offsets[nonempty], axis=0)
+    logits = logits * scale[:, None] + bias
+    return logits, indices, lengths, scale
+
+def _softmax(logits):
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+def read_labeled_file(path):
+    """Read `label<TAB>text` lines, skipping blanks and # comments"""
+    examples = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#') or '\t' not in line:
+                continue
+            label, text = line.split('\t', 1)
+            examples.append((label.strip().lower(), text))
+    return examples
+
+class HashedNgramModel:
+    def __init__(self, weights, bias, classes, n_buckets):
+        """Linear softmax model over hashed n-gram features"""
+        self.weights = weights
+        self.bias = bias
+        self.classes = list(classes)
+        self.n_buckets = n_buckets
+    
+    @classmethod
+    def train(cls, examples, n_buckets=2 ** 18, epochs=20, learning_rate=0.5, batch_size=8, seed=0):
+        """Fit the model with minibatch SGD on (label, text) examples"""
+        if n_buckets & (n_buckets - 1):
+            raise ValueError("n_buckets must be a power of two")
+        classes = sorted({label for label, _ in examples})
+        class_index = {label: i for i, label in enumerate(classes)}
+        
+        rows = [featurize(text, n_buckets) for _, text in examples]
+        labels = np.array([class_index[label] for label, _ in examples], dtype=np.int64)
+        weights = np.zeros((n_buckets, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            lr = learning_rate / (1 + epoch)
+            order = rng.permutation(len(rows))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                logits, indices, lengths, scale = _segment_logits(weights, bias, [rows[i] for i in batch])
+                
+                # Cross-entropy gradient with respect to the logits
+                grad = _softmax(logits)
+                grad[np.arange(len(batch)), labels[batch]] -= 1
+                grad /= len(batch)
+                
+                # Each feature's weight row receives its message's (scaled) gradient
+                owner = np.repeat(np.arange(len(batch)), lengths)
+                np.add.at(weights, indices, -lr * grad[owner] * scale[owner, None])
+                bias -= lr * grad.sum(axis=0)
+        
+        return cls(weights, bias, classes, n_buckets)
+    
+    def save(self, model_dir):
+        """Write weights.npy, bias.npy and meta.json to model_dir"""
+        os.makedirs(model_dir, exist_ok=True)
+        np.save(os.path.join(model_dir, 'weights.npy'), np.asarray(self.weights, dtype=np.float32))
+        np.save(os.path.join(model_dir, 'bias.npy'), np.asarray(self.bias, dtype=np.float32))
+        with open(os.path.join(model_dir, 'meta.json'), 'w') as f:
+            json.dump({'classes': self.classes, 'n_buckets': self.n_buckets}, f, indent=2)
+    
+    @classmethod
+    def load(cls, model_dir):
+        """Load a model, memory-mapping the weights read-only"""
+        with open(os.path.join(model_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        weights = np.load(os.path.join(model_dir, 'weights.npy'), mmap_mode='r')
+        bias = np.load(os.path.join(model_dir, 'bias.npy'))
+        return cls(weights, bias, meta['classes'], meta['n_buckets'])
+    
+    def predict_proba(self, texts):
+        """Class probabilities for a batch of texts, shape (len(texts), n_classes)"""
+        rows = [featurize(text, self.n_buckets) for text in texts]
+        logits, _, _, _ = _segment_logits(self.weights, self.bias, rows)
+        return _softmax(logits)
+
+class HashedNgramEngine:
+    """Emotion engine backed by a HashedNgramModel"""
+    name = 'ngram'
+    batched = True
+    
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, min_score=0.1):
+        self.model = HashedNgramModel.load(model_dir)
+        self.min_score = min_score
+        self._emotion_columns = [
+            (emotion, self.model.classes.index(emotion))
+            for emotion in EMOTIONS if emotion in self.model.classes
+        ]
+    
+    def score_batch(self, texts):
+        """Return one emotion_scores dict per text, like calculate_emotion_scores"""
+        if not texts:
+            return []
+        probabilities = self.model.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        
+        results = []
+        for row, best_index in zip(probabilities, best):
+            # A non-emotion class (e.g. neutral) winning means no emotion scores,
+            # so EmotionDetector falls back to sentiment as it does for keywords
+            if self.model.classes[best_index] not in EMOTIONS:
+                results.append({})
+                continue
+            results.append({
+                emotion: float(row[column])
+                for emotion, column in self._emotion_columns
+                if row[column] >= self.min_score
+            })
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the hashed n-gram emotion model')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    train_parser = subparsers.add_parser('train', help='train on a label<TAB>text file')
+    train_parser.add_argument('data')
+    train_parser.add_argument('model_dir', nargs='?', default=DEFAULT_MODEL_DIR)
+    train_parser.add_argument('--buckets', type=int, default=2 ** 18)
+    train_parser.add_argument('--epochs', type=int, default=20)
+    train_parser.add_argument('--learning-rate', type=float, default=0.5)
+    args = parser.parse_args()
+    
+    examples = read_labeled_file(args.data)
+    if not examples:
+        print(f"No labeled examples found in {args.data}")
+        return 1
+    
+    model = HashedNgramModel.train(
+        examples, n_buckets=args.buckets, epochs=args.epochs, learning_rate=args.learning_rate
+    )
+    model.save(args.model_dir)
+    print(f"Trained on {len(examples)} examples ({', '.join(model.classes)}); saved to {args.model_dir}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
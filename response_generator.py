@@ -3,6 +3,9 @@ import re
 from datetime import datetime
 
 class ResponseGenerator:
+    # Emotion score above which responses get intensity markers
+    HIGH_INTENSITY = 0.7
+    
     def __init__(self):
         """Initialize the response generator with emotion-specific templates"""
         
@@ -208,6 +211,41 @@ class ResponseGenerator:
                 "What would make today feel like a good day for you?"
             ]
         }
+        
+        # Topic keywords and the context sentence added for each, in priority order
+        self.topics = {
+            'work': (['work', 'job', 'boss', 'colleague'],
+                     "Work situations can be especially challenging to navigate."),
+            'family': (['family', 'parent', 'mom', 'dad', 'sister', 'brother'],
+                       "Family relationships can bring up such complex emotions."),
+            'relationship': (['relationship', 'partner', 'boyfriend', 'girlfriend', 'spouse'],
+                             "Relationships require so much emotional energy and care."),
+            'school': (['school', 'study', 'exam', 'test', 'grade'],
+                       "Academic pressure can really weigh on us."),
+            'health': (['health', 'sick', 'doctor', 'hospital'],
+                       "Health concerns can be so worrying and overwhelming.")
+        }
+        # Keywords match anywhere in the input, like `in`
+        self._topic_patterns = {
+            topic: re.compile('|'.join(map(re.escape, keywords)))
+            for topic, (keywords, _) in self.topics.items()
+        }
+        self._keyword_topics = {}
+        for topic, (keywords, _) in self.topics.items():
+            for keyword in keywords:
+                self._keyword_topics.setdefault(keyword, topic)
+        self._topic_pattern = re.compile('|'.join(map(re.escape, self._keyword_topics)))
+        
+        # Fallback responses served in degraded mode, built once per emotion
+        self._fallback_cache = {}
+    
+    def get_fallback_response(self, emotion, sentiment='neutral'):
+        """Return a cached response for the emotion without assembling a new one"""
+        response = self._fallback_cache.get(emotion)
+        if response is None:
+            response = self.generate_response('', emotion, sentiment, {})
+            self._fallback_cache[emotion] = response
+        return response
     
     def generate_response(self, user_input, emotion, sentiment, emotion_scores):
         """Generate an appropriate response based on detected emotion and sentiment"""
@@ -272,16 +310,23 @@ class ResponseGenerator:
                 full_response = f"{response_parts[0]} {transition} {' '.join(response_parts[1:])}"
             
             # Add personalization based on emotion intensity
-            if emotion_scores and max(emotion_scores.values()) > 0.7:
+            if self.is_high_intensity(emotion_scores):
                 # High intensity emotion - more emphatic response
                 full_response = self.add_intensity_markers(full_response, emotion)
             
+            # Acknowledge what the message is about (work, family, ...)
+            full_response = self.personalize_response(full_response, user_input)
+            
             return full_response
             
         except Exception as e:
             # Fallback response
             return f"I can sense you're feeling {emotion}, and I want you to know I'm here to listen and support you. What's on your mind?"
     
+    def is_high_intensity(self, emotion_scores):
+        """Whether the strongest emotion score calls for a more emphatic response"""
+        return bool(emotion_scores) and max(emotion_scores.values()) > self.HIGH_INTENSITY
+    
     def add_intensity_markers(self, response, emotion):
         """Add intensity markers for strong emotions"""
         if emotion == 'joy':
@@ -309,25 +354,29 @@ class ResponseGenerator:
         
         return response
     
+    def detect_topic(self, user_input):
+        """Return the first topic whose keywords appear in the input, or None"""
+        user_lower = user_input.lower()
+        match = self._topic_pattern.search(user_lower)
+        if match is None:
+            return None
+        
+        # The first match may belong to a lower-priority topic than a later one
+        found = self._keyword_topics[match.group()]
+        for topic, pattern in self._topic_patterns.items():
+            if topic == found or pattern.search(user_lower):
+                return topic
+    
     def personalize_response(self, response, user_input):
         """Add personalization based on user's specific input"""
         # Extract key topics or concerns from user input
-        user_lower = user_input.lower()
+        topic = self.detect_topic(user_input)
+        if topic is None:
+            return response
         
         # Add contextual understanding
-        if any(word in user_lower for word in ['work', 'job', 'boss', 'colleague']):
-            response += " Work situations can be especially challenging to navigate."
-        
-        elif any(word in user_lower for word in ['family', 'parent', 'mom', 'dad', 'sister', 'brother']):
-            response += " Family relationships can bring up such complex emotions."
-        
-        elif any(word in user_lower for word in ['relationship', 'partner', 'boyfriend', 'girlfriend', 'spouse']):
-            response += " Relationships require so much emotional energy and care."
-        
-        elif any(word in user_lower for word in ['school', 'study', 'exam', 'test', 'grade']):
-            response += " Academic pressure can really weigh on us."
-        
-        elif any(word in user_lower for word in ['health', 'sick', 'doctor', 'hospital']):
-            response += " Health concerns can be so worrying and overwhelming."
-        
-        return response
+        return self.add_topic_context(response, topic)
+    
+    def add_topic_context(self, response, topic):
+        """Append the context sentence for a topic"""
+        return f"{response} {self.topics[topic][1]}"
@@ -0,0 +1,162 @@
+import itertools
+import os
+import threading
+from collections import deque
+
+class ResponsePool:
+    def __init__(self, response_generator, pool_size=16, low_water=4, repeat_window=12,
+                 max_attempts=32, refill_interval=5.0):
+        """Precomputed replies per (emotion, high intensity, topic), refilled in the background
+        
+        A reply depends only on the emotion, whether the strongest score is high
+        intensity, the detected topic and random template picks, so whole replies
+        are assembled ahead of time and serving one is a deque pop. A pool that
+        drops to `low_water` wakes the refill thread; an empty pool assembles a
+        reply inline. Either way, candidates matching any of the last
+        `repeat_window` replies issued for the same key are rejected, so a reply
+        does not come back until that many others have been served.
+        Can be used anywhere a ResponseGenerator is expected.
+        """
+        self.response_generator = response_generator
+        self.pool_size = pool_size
+        self.low_water = low_water
+        self.repeat_window = repeat_window
+        self.max_attempts = max_attempts
+        self.refill_interval = refill_interval
+        
+        topics = [None] + list(response_generator.topics)
+        self._pools = {}
+        self._recent = {}
+        for emotion in response_generator.emotion_responses:
+            for high_intensity in (False, True):
+                for topic in topics:
+                    key = (emotion, high_intensity, topic)
+                    self._pools[key] = deque()
+                    self._recent[key] = deque(maxlen=repeat_window)
+        
+        # next() on itertools.count is atomic, so hits are counted without the lock
+        self._hits = itertools.count()
+        self.misses = 0
+        # Guards the recent-reply windows, the miss counter and refills
+        self._lock = threading.Lock()
+        self._refill_needed = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        
+        # Precompute every pool up front so the first requests are hits
+        self.fill()
+    
+    def start(self):
+        """Start the background refill thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='feelbot-response-pool', daemon=True)
+            self._thread.start()
+        return self
+    
+    def close(self, timeout=5):
+        """Stop the background refill thread"""
+        self._stop.set()
+        self._refill_needed.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def take(self, emotion, high_intensity=False, topic=None):
+        """Return a precomputed reply for the key, assembling one only if its pool is empty"""
+        key = (emotion, high_intensity, topic)
+        pool = self._pools[key]
+        try:
+            response = pool.popleft()
+            next(self._hits)
+        except IndexError:
+            with self._lock:
+                # The refill thread may have topped the pool up meanwhile; those
+                # replies were issued first, so serve them before composing
+                try:
+                    response = pool.popleft()
+                    next(self._hits)
+                except IndexError:
+                    response = self._next_unique(key)
+                    self.misses += 1
+        
+        if len(pool) <= self.low_water and not self._refill_needed.is_set():
+            self._refill_needed.set()
+        return response
+    
+    def generate_response(self, user_input, emotion, sentiment, emotion_scores):
+        """Same contract as ResponseGenerator.generate_response, served from the pool"""
+        if emotion not in self.response_generator.emotion_responses:
+            return self.response_generator.generate_response(user_input, emotion, sentiment, emotion_scores)
+        return self.take(
+            emotion,
+            self.response_generator.is_high_intensity(emotion_scores),
+            self.response_generator.detect_topic(user_input)
+        )
+    
+    def get_fallback_response(self, emotion, sentiment='neutral'):
+        """Same contract as ResponseGenerator.get_fallback_response, served from the pool"""
+        if emotion not in self.response_generator.emotion_responses:
+            return self.response_generator.get_fallback_response(emotion, sentiment)
+        return self.take(emotion)
+    
+    def fill(self):
+        """Top up every pool that is at or below the low-water mark"""
+        for key, pool in self._pools.items():
+            if len(pool) > self.low_water:
+                continue
+            with self._lock:
+                while len(pool) < self.pool_size:
+                    pool.append(self._next_unique(key))
+    
+    @property
+    def hits(self):
+        """Number of replies served from a pool"""
+        # itertools.count has no accessor; its repr is 'count(<next value>)'
+        return int(repr(self._hits)[len('count('):-1])
+    
+    def stats(self):
+        """Return hit/miss counters and the number of replies currently pooled"""
+        return {
+            'keys': len(self._pools),
+            'pooled': sum(len(pool) for pool in self._pools.values()),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+    
+    def _next_unique(self, key):
+        """Assemble a reply for the key that is not in its recent window (caller holds the lock)"""
+        recent = self._recent[key]
+        for _ in range(self.max_attempts):
+            response = self._compose(key)
+            if response not in recent:
+                break
+        # Keys with very few distinct replies can run out of fresh ones; repeat rather than stall
+        recent.append(response)
+        return response
+    
+    def _compose(self, key):
+        emotion, high_intensity, topic = key
+        # Any score above the threshold selects the emphatic templates
+        emotion_scores = {emotion: 1.0} if high_intensity else {}
+        # An empty input has no topic, so the topic sentence is added here
+        response = self.response_generator.generate_response('', emotion, 'neutral', emotion_scores)
+        if topic is not None:
+            response = self.response_generator.add_topic_context(response, topic)
+        return response
+    
+    def _run(self):
+        while not self._stop.is_set():
+            self._refill_needed.wait(self.refill_interval)
+            self._refill_needed.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.fill()
+            except Exception as e:
+                print(f"Warning: response pool refill failed: {e}")
+
+def create_response_pool_from_env(response_generator):
+    """Wrap the generator in a started ResponsePool unless FEELBOT_RESPONSE_POOL=0"""
+    if os.environ.get('FEELBOT_RESPONSE_POOL', '1') == '0':
+        return response_generator
+    return ResponsePool(response_generator).start()
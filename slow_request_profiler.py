@@ -0,0 +1,272 @@
+"""Opt-in sampling profiler for slow emotion analysis requests.
+
+Enable it by setting FEELBOT_PROFILE_MS to a latency threshold in ms. While a
+request runs, a background thread samples its stack; requests that finish
+under the threshold are discarded, slower ones are saved to
+FEELBOT_PROFILE_DIR (default: profiles/) as JSON together with a hashed and
+redacted copy of the input. Summarize the saved profiles with:
+
+    python slow_request_profiler.py [profiles/] [--top 10]
+
+Slow requests are handed to the sampler thread, which builds the record and
+writes the files, so the request itself never waits on disk. At most one
+profile is written per `min_save_interval` seconds and only the newest
+`max_files` are kept.
+
+The sampler is a Python thread, so it only runs when the GIL is released. A
+single long C-level call such as a backtracking regex holds the GIL until it
+returns, and a request spending its time in one holds about one sample (50
+requests of ~107 ms in one regex gave 50 samples in total). Its latency is
+still exact; the stacks just show the frame that made the call.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+_LETTERS = re.compile(r'[A-Za-z]')
+_DIGITS = re.compile(r'[0-9]')
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+_RUNS = re.compile(r'(.)\1{7,}')
+_ELONGATED = re.compile(r'(.)\1{49,}')
+
+def redact_text(text, max_length=200):
+    """Keep the shape of the input (letters->a, digits->9) without its content"""
+    redacted = _LETTERS.sub('a', text)
+    redacted = _DIGITS.sub('9', redacted)
+    redacted = _NON_ASCII.sub('u', redacted)
+    # Long runs of one character become e.g. 'a{5000}'
+    redacted = _RUNS.sub(lambda m: f"{m.group(1)}{{{len(m.group(0))}}}", redacted)
+    if len(redacted) > max_length:
+        redacted = f"{redacted[:max_length]}...(+{len(redacted) - max_length} chars)"
+    return redacted
+
+def classify_input(text):
+    """Bucket an input into a coarse class for the slow-input report"""
+    if _ELONGATED.search(text):
+        return 'elongated'
+    if text.count('http') >= 5 or ('http' in text and len(text) > 2000):
+        return 'url_heavy'
+    if len(text) > 10000:
+        return 'huge'
+    if len(text) > 1000:
+        return 'long'
+    if not text.isascii():
+        return 'non_ascii'
+    return 'normal'
+
+class SlowRequestProfiler:
+    def __init__(self, threshold_ms=100.0, interval_ms=1.0, output_dir='profiles',
+                 max_depth=64, max_records=1000, max_files=200, min_save_interval=1.0,
+                 max_pending=32):
+        """Stack-sample requests and keep the profiles of those over threshold_ms
+        
+        Up to `max_pending` slow requests wait for the sampler thread to record
+        them; beyond that they are counted in `dropped`. Profiles skipped by the
+        save rate limit are still kept in `records`, only not written to disk.
+        """
+        self.threshold_ms = threshold_ms
+        self.interval = interval_ms / 1000
+        self.output_dir = output_dir
+        self.max_depth = max_depth
+        self.records = deque(maxlen=max_records)
+        self.max_files = max_files
+        self.min_save_interval = min_save_interval
+        self.max_pending = max_pending
+        self.dropped = 0
+        
+        self._active = {}
+        self._pending = []
+        self._last_save = None
+        self._lock = threading.Lock()
+        self._has_work = threading.Event()
+        self._sampler = None
+    
+    def _ensure_sampler(self):
+        if self._sampler is None:
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name='feelbot-profiler', daemon=True
+            )
+            self._sampler.start()
+    
+    def _stack_key(self, frame):
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(stack))
+    
+    def _sample_loop(self):
+        while True:
+            # Sleep until at least one request is being tracked
+            self._has_work.wait()
+            time.sleep(self.interval)
+            
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[self._stack_key(frame)] += 1
+                pending, self._pending = self._pending, []
+                if not self._active:
+                    self._has_work.clear()
+            del frames
+            
+            for item in pending:
+                self._save(*item)
+    
+    @contextmanager
+    def track(self, text, mode='full'):
+        """Profile the enclosed block; keep the result if it runs too long"""
+        thread_id = threading.get_ident()
+        samples = Counter()
+        with self._lock:
+            self._active[thread_id] = samples
+            self._ensure_sampler()
+            self._has_work.set()
+        
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._active.pop(thread_id, None)
+                if elapsed_ms >= self.threshold_ms:
+                    # Hashing, redaction and file writes happen on the sampler thread
+                    if len(self._pending) < self.max_pending:
+                        self._pending.append((text, mode, elapsed_ms, samples, time.time()))
+                        self._has_work.set()
+                    else:
+                        self.dropped += 1
+    
+    def _save(self, text, mode, elapsed_ms, samples, timestamp):
+        """Store a slow request's profile in memory and, rate limited, on disk"""
+        input_hash = hashlib.sha256(text.encode('utf-8', 'replace')).hexdigest()
+        record = {
+            'timestamp': timestamp,
+            'input_sha256': input_hash,
+            'input_redacted': redact_text(text),
+            'input_length': len(text),
+            'input_class': classify_input(text),
+            'mode': mode,
+            'latency_ms': elapsed_ms,
+            'samples': sum(samples.values()),
+            'stacks': dict(samples.most_common())
+        }
+        self.records.append(record)
+        
+        if not self.output_dir:
+            return
+        now = time.monotonic()
+        if self._last_save is not None and now - self._last_save < self.min_save_interval:
+            return
+        self._last_save = now
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            name = f"{int(record['timestamp'] * 1000)}-{input_hash[:12]}"
+            with open(os.path.join(self.output_dir, name + '.json'), 'w') as f:
+                json.dump(record, f)
+            # Folded stacks, ready for flamegraph.pl / speedscope
+            with open(os.path.join(self.output_dir, name + '.folded'), 'w') as f:
+                for stack, count in samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            self._prune_files()
+        except OSError as e:
+            print(f"Warning: could not save profile: {e}")
+    
+    def _prune_files(self):
+        """Delete the oldest saved profiles beyond max_files"""
+        # Names start with a millisecond timestamp, so they sort oldest first
+        names = sorted(name[:-len('.json')] for name in os.listdir(self.output_dir)
+                       if name.endswith('.json'))
+        for name in names[:max(len(names) - self.max_files, 0)]:
+            for extension in ('.json', '.folded'):
+                try:
+                    os.remove(os.path.join(self.output_dir, name + extension))
+                except FileNotFoundError:
+                    pass
+    
+    def report(self, top=10):
+        """Summarize the slow requests recorded in this process"""
+        return summarize_records(self.records, top)
+
+def create_profiler_from_env():
+    """Return a SlowRequestProfiler if FEELBOT_PROFILE_MS is set, otherwise None"""
+    threshold = os.environ.get('FEELBOT_PROFILE_MS')
+    if not threshold:
+        return None
+    return SlowRequestProfiler(
+        threshold_ms=float(threshold),
+        output_dir=os.environ.get('FEELBOT_PROFILE_DIR', 'profiles')
+    )
+
+def summarize_records(records, top=10):
+    """Group slow requests by input class, slowest classes first"""
+    by_class = defaultdict(list)
+    for record in records:
+        by_class[record['input_class']].append(record)
+    
+    summary = []
+    for input_class, group in by_class.items():
+        latencies = [r['latency_ms'] for r in group]
+        # Leaf frames show where the time actually went
+        leaf_frames = Counter()
+        for r in group:
+            for stack, count in r['stacks'].items():
+                leaf_frames[stack.rsplit(';', 1)[-1]] += count
+        summary.append({
+            'input_class': input_class,
+            'count': len(group),
+            'total_ms': sum(latencies),
+            'mean_ms': sum(latencies) / len(latencies),
+            'max_ms': max(latencies),
+            'top_frames': leaf_frames.most_common(3),
+            'example': max(group, key=lambda r: r['latency_ms'])['input_redacted']
+        })
+    
+    summary.sort(key=lambda s: s['total_ms'], reverse=True)
+    return summary[:top]
+
+def load_records(directory):
+    """Load the profile records saved in a directory"""
+    records = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as f:
+                records.append(json.load(f))
+    return records
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the slowest input classes')
+    parser.add_argument('directory', nargs='?', default=os.environ.get('FEELBOT_PROFILE_DIR', 'profiles'))
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+    
+    if not os.path.isdir(args.directory):
+        print(f"No profiles found in {args.directory}")
+        return 1
+    
+    summary = summarize_records(load_records(args.directory), args.top)
+    if not summary:
+        print(f"No profiles found in {args.directory}")
+        return 1
+    
+    for entry in summary:
+        print(f"{entry['input_class']}: {entry['count']} requests, "
+              f"mean {entry['mean_ms']:.1f} ms, max {entry['max_ms']:.1f} ms")
+        print(f"  slowest input: {entry['example']}")
+        for frame, count in entry['top_frames']:
+            print(f"  {count:6d} samples  {frame}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
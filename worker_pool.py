@@ -0,0 +1,275 @@
+import multiprocessing
+import multiprocessing.connection
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+def analyze_and_respond(overload_controller, response_generator, text):
+    """Analyze a message and build FeelBot's reply"""
+    return analyze_and_respond_batch(overload_controller, response_generator, [text])[0]
+
+def analyze_and_respond_batch(overload_controller, response_generator, texts):
+    """Analyze a batch of messages and return (emotion_data, bot_response) pairs"""
+    results = []
+    for text, emotion_data in zip(texts, overload_controller.analyze_batch(texts)):
+        if emotion_data.get('mode') == 'sentiment':
+            # Under heavy load serve a cached response instead
+            bot_response = response_generator.get_fallback_response(
+                emotion_data['primary_emotion'], emotion_data['sentiment']
+            )
+        else:
+            bot_response = response_generator.generate_response(
+                user_input=text,
+                emotion=emotion_data['primary_emotion'],
+                sentiment=emotion_data['sentiment'],
+                emotion_scores=emotion_data['emotion_scores']
+            )
+        results.append((emotion_data, bot_response))
+    return results
+
+def _worker_main(worker_index, inbox, results, batch_size):
+    """Entry point of a worker process: analyze requests until told to stop"""
+    from emotion_detector import EmotionDetector
+    from engines import create_engine_from_env
+    from load_shedding import OverloadController
+    from response_generator import ResponseGenerator
+    from response_pool import create_response_pool_from_env
+    from slow_request_profiler import create_profiler_from_env
+    
+    emotion_detector = EmotionDetector()
+    emotion_detector.profiler = create_profiler_from_env()
+    emotion_detector.engine = create_engine_from_env(emotion_detector)
+    emotion_detector.warm_up(background=False)
+    overload_controller = OverloadController(emotion_detector)
+    response_generator = create_response_pool_from_env(ResponseGenerator())
+    
+    results.send(('ready', worker_index, None))
+    
+    stopping = False
+    while not stopping:
+        message = inbox.get()
+        if message is None:
+            break
+        
+        # Take whatever else is already queued so the engine can score it in one batch
+        batch = [message]
+        while len(batch) < batch_size:
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                stopping = True
+                break
+            batch.append(message)
+        
+        try:
+            replies = analyze_and_respond_batch(
+                overload_controller, response_generator, [text for _, _, text in batch]
+            )
+        except Exception as e:
+            for request_id, _, _ in batch:
+                results.send(('error', request_id, str(e)))
+            continue
+        
+        for (request_id, _, _), (emotion_data, bot_response) in zip(batch, replies):
+            results.send(('result', request_id, {
+                'analysis': emotion_data,
+                'response': bot_response,
+                'worker': worker_index
+            }))
+
+class AnalysisWorkerPool:
+    def __init__(self, num_workers=2, batch_size=32, start_method='spawn', health_check_interval=0.5):
+        """Pool of worker processes that run analysis outside the UI process
+        
+        Each session is pinned to one worker (by a stable hash of its id), so
+        a conversation's messages are analyzed in the order they were sent.
+        Requests reach a worker over its own queue and results come back over
+        its own pipe, so a worker killed mid-write cannot block the others.
+        A worker analyzes up to `batch_size` queued requests together. Every
+        `health_check_interval` seconds dead workers are restarted, and the
+        requests they held fail at once instead of waiting out their timeout.
+        """
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.health_check_interval = health_check_interval
+        self._context = multiprocessing.get_context(start_method)
+        
+        self._inboxes = []
+        self._processes = []
+        # Read ends of the per-worker result pipes; None once a worker's pipe hit EOF
+        self._results = []
+        self._wakeup_reader = None
+        self._wakeup_writer = None
+        self._collector = None
+        self._futures = {}
+        self._ready = set()
+        self._ready_event = threading.Event()
+        self._lock = threading.Lock()
+        self._closing = False
+        self._next_request_id = 0
+    
+    def start(self, wait=True, timeout=120):
+        """Start the worker processes, optionally waiting until they are warm
+        
+        Without waiting, requests submitted meanwhile queue in the workers'
+        inboxes and are answered once their worker has loaded its models.
+        """
+        self._wakeup_reader, self._wakeup_writer = self._context.Pipe(duplex=False)
+        try:
+            for index in range(self.num_workers):
+                inbox, results, process = self._spawn_worker(index)
+                self._inboxes.append(inbox)
+                self._results.append(results)
+                self._processes.append(process)
+        except Exception:
+            self.close()
+            raise
+        
+        self._collector = threading.Thread(
+            target=self._collect_results, name='feelbot-worker-results', daemon=True
+        )
+        self._collector.start()
+        
+        if wait and not self._ready_event.wait(timeout):
+            ready = len(self._ready)
+            # Do not leave half a pool running; the caller may simply retry
+            self.close()
+            raise TimeoutError(f"Only {ready} of {self.num_workers} workers started")
+        return self
+    
+    def _spawn_worker(self, index):
+        inbox = self._context.Queue()
+        results, worker_end = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, inbox, worker_end, self.batch_size),
+            name=f'feelbot-worker-{index}',
+            daemon=True
+        )
+        process.start()
+        # Only the worker writes to its pipe, so the read end sees EOF when it dies
+        worker_end.close()
+        return inbox, results, process
+    
+    def worker_for(self, session_id):
+        """Return the index of the worker that owns a session"""
+        return zlib.crc32(str(session_id).encode('utf-8')) % self.num_workers
+    
+    def worker_pids(self):
+        """Return the process id of each worker, by worker index"""
+        with self._lock:
+            return [process.pid for process in self._processes]
+    
+    def submit(self, session_id, text):
+        """Queue a message for analysis and return a Future for the result"""
+        future = Future()
+        worker_index = self.worker_for(session_id)
+        with self._lock:
+            request_id = self._next_request_id
+            self._next_request_id += 1
+            self._futures[request_id] = (future, worker_index)
+            # Under the lock so a restart cannot swap the inbox in between
+            self._inboxes[worker_index].put((request_id, session_id, text))
+        return future
+    
+    def analyze(self, session_id, text, timeout=30):
+        """Analyze a message and wait for the result dict"""
+        return self.submit(session_id, text).result(timeout=timeout)
+    
+    def _collect_results(self):
+        last_check = time.monotonic()
+        while True:
+            if time.monotonic() - last_check >= self.health_check_interval:
+                self._check_workers()
+                last_check = time.monotonic()
+            # Restarts swap pipes, so the set to wait on is rebuilt every round
+            with self._lock:
+                readers = {conn: index for index, conn in enumerate(self._results) if conn is not None}
+            ready = multiprocessing.connection.wait(
+                list(readers) + [self._wakeup_reader], timeout=self.health_check_interval
+            )
+            for conn in ready:
+                if conn is self._wakeup_reader:
+                    return
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    # The worker is gone; the health check gives its replacement a new pipe
+                    with self._lock:
+                        if self._results[readers[conn]] is conn:
+                            self._results[readers[conn]] = None
+                    conn.close()
+                    continue
+                self._handle_message(*message)
+    
+    def _handle_message(self, kind, key, payload):
+        if kind == 'ready':
+            self._ready.add(key)
+            if len(self._ready) == self.num_workers:
+                self._ready_event.set()
+            return
+        
+        with self._lock:
+            entry = self._futures.pop(key, None)
+        if entry is None:
+            return
+        future, _ = entry
+        if kind == 'result':
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(payload))
+    
+    def _check_workers(self):
+        """Restart dead workers and fail the requests that were queued on them"""
+        with self._lock:
+            dead = [index for index, process in enumerate(self._processes) if not process.is_alive()]
+            if not dead or self._closing:
+                return
+            failed = []
+            for index in dead:
+                print(f"Warning: worker {index} exited with code {self._processes[index].exitcode}, restarting")
+                self._ready.discard(index)
+                if self._results[index] is not None:
+                    self._results[index].close()
+                self._inboxes[index], self._results[index], self._processes[index] = self._spawn_worker(index)
+                failed += [request_id for request_id, (_, worker) in self._futures.items() if worker == index]
+            futures = [self._futures.pop(request_id)[0] for request_id in failed]
+        
+        for future in futures:
+            future.set_exception(RuntimeError("Worker process died"))
+    
+    def close(self, timeout=5):
+        """Stop the workers and the result collector"""
+        with self._lock:
+            # Exiting workers must not be restarted by the health check
+            self._closing = True
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        if self._collector is not None:
+            self._wakeup_writer.send('stop')
+            self._collector.join(timeout)
+            self._collector = None
+        for conn in self._results:
+            if conn is not None:
+                conn.close()
+        if self._wakeup_reader is not None:
+            self._wakeup_reader.close()
+            self._wakeup_writer.close()
+            self._wakeup_reader = self._wakeup_writer = None
+        
+        with self._lock:
+            for future, _ in self._futures.values():
+                future.set_exception(RuntimeError("Worker pool closed"))
+            self._futures.clear()
+        
+        self._inboxes = []
+        self._processes = []
+        self._results = []